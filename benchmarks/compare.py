@@ -0,0 +1,39 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark JSON reports stage by stage:
+
+    python -m benchmarks.compare before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, Tuple
+
+
+def _index(path: str) -> Tuple[dict, Dict[Tuple[str, int], dict]]:
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    return report["meta"], {(r["stage"], r["size"]): r for r in report["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before_meta, before = _index(args.before)
+    after_meta, after = _index(args.after)
+    print(f"{before_meta['commit']} -> {after_meta['commit']}")
+    print(f"{'stage':<18} {'size':>7} {'time':>9} {'peak mem':>9}")
+
+    for key in sorted(before.keys() & after.keys()):
+        b, a = before[key], after[key]
+        time_ratio = a["seconds"] / b["seconds"] if b["seconds"] else float("nan")
+        mem_ratio = a["peak_bytes"] / b["peak_bytes"] if b["peak_bytes"] else float("nan")
+        print(f"{key[0]:<18} {key[1]:>7} {time_ratio:>8.2f}x {mem_ratio:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/corpus.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List, Optional
+from xml.sax.saxutils import escape
+import random
+
+_SUBJECTS = [
+    "Fed", "ECB", "Bank of England", "BOJ", "Treasury yields", "Gilts", "Bunds",
+    "The dollar", "Oil", "Euro zone", "China", "Emerging markets", "Wall Street",
+    "European stocks", "Japan", "The IMF", "OECD", "US payrolls",
+]
+_MACRO_PHRASES = [
+    "signals rate cut", "weighs rate hike", "warns on inflation", "sees soft landing",
+    "flags recession risk", "holds interest rate", "eyes quantitative tightening",
+    "cuts GDP forecast", "reports core inflation", "faces budget deficit",
+    "says labour market cooling", "sees bond market volatility",
+]
+_OTHER_PHRASES = [
+    "unveils new product", "beats earnings estimates", "names new chief executive",
+    "shares jump on merger talk", "expands into Asia", "settles lawsuit",
+    "launches streaming service", "recalls vehicles", "opens flagship store",
+]
+_FILLER = (
+    "analysts investors said on markets week traders policy outlook data quarter "
+    "officials statement growth prices demand supply global economy report survey "
+    "expectations percent points month year sector companies earnings"
+).split()
+
+
+def _title(rng: random.Random, macro_share: float) -> str:
+    phrases = _MACRO_PHRASES if rng.random() < macro_share else _OTHER_PHRASES
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(phrases)}"
+
+
+def _summary(rng: random.Random, title: str) -> str:
+    sentences = []
+    for _ in range(rng.randint(2, 5)):
+        words = rng.sample(_FILLER, rng.randint(8, 16))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return f"<p>{title}. {' '.join(sentences)}</p><p><a href=\"https://example.com\">Read more</a></p>"
+
+
+def generate_entries(
+    count: int,
+    seed: int = 42,
+    macro_share: float = 0.35,
+    now: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    Deterministic synthetic feed entries: headline, HTML summary, link and a
+    timestamp spread over the past week. `macro_share` of headlines use macro
+    phrases so filtering has a realistic hit rate.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
+    entries = []
+    for i in range(count):
+        title = _title(rng, macro_share)
+        entries.append(
+            {
+                "title": title,
+                "link": f"https://news.example.com/{i}/{title.lower().replace(' ', '-')}",
+                "summary": _summary(rng, title),
+                "published": now - timedelta(seconds=rng.randint(0, 7 * 24 * 3600)),
+            }
+        )
+    return entries
+
+
+def to_rss(entries: List[dict], title: str = "Synthetic Macro Feed") -> bytes:
+    items = "".join(
+        "<item>"
+        f"<title>{escape(e['title'])}</title>"
+        f"<link>{escape(e['link'])}</link>"
+        f"<guid>{escape(e['link'])}</guid>"
+        f"<description>{escape(e['summary'])}</description>"
+        f"<pubDate>{format_datetime(e['published'])}</pubDate>"
+        "</item>"
+        for e in entries
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(title)}</title><link>https://news.example.com/</link>"
+        "<description>Synthetic benchmark corpus</description>"
+        f"{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+def to_atom(entries: List[dict], title: str = "Synthetic Macro Feed") -> bytes:
+    items = "".join(
+        "<entry>"
+        f"<title>{escape(e['title'])}</title>"
+        f'<link href="{escape(e["link"])}"/>'
+        f"<id>{escape(e['link'])}</id>"
+        f"<updated>{e['published'].isoformat()}</updated>"
+        f'<summary type="html">{escape(e["summary"])}</summary>'
+        "</entry>"
+        for e in entries
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{escape(title)}</title><id>https://news.example.com/</id>"
+        "<updated>2025-01-15T07:00:00+00:00</updated>"
+        f"{items}</feed>"
+    ).encode("utf-8")
@@ -0,0 +1,69 @@
+# benchmarks/import_time.py
+"""
+Check that the CLI stays cheap to start:
+
+    python -m benchmarks.import_time --budget-ms 150
+
+Imports `src.cli` in fresh interpreters and fails (exit 1) if the best
+`-X importtime` total is over budget, or if a heavy dependency that only some
+subcommands need got imported eagerly.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import List
+
+# Modules that no subcommand should pay for at startup
+LAZY_MODULES = ("feedparser", "sendgrid", "dotenv", "numpy", "sqlite3")
+
+
+def _import_time_us(module: str) -> int:
+    """
+    Cumulative import time (microseconds) of `module` in a fresh interpreter.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    pattern = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| " + re.escape(module) + r"$")
+    for line in out.stderr.splitlines():
+        match = pattern.search(line)
+        if match:
+            return int(match.group(1))
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def _eager_imports(module: str) -> List[str]:
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="CLI import-time budget check.")
+    parser.add_argument("--module", default="src.cli")
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=5, help="best of N fresh interpreters")
+    args = parser.parse_args(argv)
+
+    best_ms = min(_import_time_us(args.module) for _ in range(args.runs)) / 1000
+    eager = _eager_imports(args.module)
+
+    print(f"import {args.module}: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    ok = best_ms <= args.budget_ms
+    if eager:
+        print(f"eagerly imported: {', '.join(eager)}")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# benchmarks/parity.py
+"""
+Parity check: the fast-path parser (src/fastparse.py) against feedparser.
+
+Run from the project root, e.g.:
+
+    python -m benchmarks.parity                        # synthetic + edge cases
+    python -m benchmarks.parity --snapshot 2025-01-15  # recorded feeds too
+
+For every feed the fast path accepts, each entry's title, link, publish time
+and plain-text summary must match what feedparser + _parse_entry produce;
+feeds it rejects are reported as fallbacks (that is the expected outcome for
+the malformed / unusual cases). Exits non-zero on any mismatch. Parse times
+for both parsers are printed alongside.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import feedparser
+
+from src.fastparse import UnsupportedFeed, parse
+from src.scraper import _parse_entry
+from src.text import summary_text
+
+from .corpus import generate_entries, to_atom, to_rss
+
+Record = Tuple[str, str, Optional[str], str]
+
+_RSS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" '
+    'xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>Edge</title><ttl>30</ttl>'
+)
+_ATOM_HEAD = '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Edge</title>'
+
+# Small feeds exercising the corners; (name, body, headers)
+EDGE_CASES = [
+    (
+        "rss-escaping-and-relative-link",
+        _RSS_HEAD + "<item><title>A &amp; B &lt;b&gt;bold&lt;/b&gt;</title><link>/rel/1</link>"
+        "<description>&lt;p&gt;Hi &lt;script&gt;x()&lt;/script&gt;there&lt;/p&gt;</description>"
+        "<pubDate>Tue, 14 Jan 2025 10:00:00 EST</pubDate></item></channel></rss>",
+        {"content-location": "https://base.example.com/feed/"},
+    ),
+    (
+        "rss-content-encoded-and-dc-date",
+        _RSS_HEAD + "<item><title>  spaced\n title </title><link> https://a.example.com/2 </link>"
+        "<content:encoded><![CDATA[<p>only content</p>]]></content:encoded>"
+        "<dc:date>2025-01-14T10:00:00Z</dc:date></item></channel></rss>",
+        {},
+    ),
+    (
+        "rss-guid-as-link-no-title",
+        _RSS_HEAD + "<item><guid>https://a.example.com/guid</guid><description>plain</description>"
+        "<pubDate>14 Jan 2025 10:00 +0100</pubDate></item>"
+        '<item><title>Not a link</title><guid isPermaLink="false">tag:1</guid></item></channel></rss>',
+        {},
+    ),
+    (
+        "atom-html-title-alternate-link",
+        _ATOM_HEAD + '<entry><title type="html">A &amp;amp; &lt;b&gt;B&lt;/b&gt;</title>'
+        '<link rel="self" href="https://a.example.com/self"/>'
+        '<link rel="alternate" type="text/html" href="https://a.example.com/alt"/>'
+        '<content type="html">&lt;p&gt;content only&lt;/p&gt;</content>'
+        "<published>2025-01-14T10:00:00+02:00</published><updated>2025-01-15T10:00:00Z</updated>"
+        "</entry><entry><title>T</title><link href=\"https://a.example.com/x\"/>"
+        "<summary>plain text</summary><updated>2025-01-15T10:00:00.123Z</updated></entry></feed>",
+        {},
+    ),
+    (
+        "atom-xhtml-falls-back",
+        _ATOM_HEAD + '<entry><title type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">X<b>h</b></div>'
+        "</title><link href=\"https://a.example.com/\"/></entry></feed>",
+        {},
+    ),
+    (
+        "malformed-falls-back",
+        _RSS_HEAD + "<item><title>Caf&eacute; &nbsp;</title><link>https://a.example.com/</link></item>"
+        "</channel></rss>",
+        {},
+    ),
+    (
+        "rss1-falls-back",
+        '<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+        'xmlns="http://purl.org/rss/1.0/"><item rdf:about="https://a.example.com/"><title>T</title>'
+        "<link>https://a.example.com/</link></item></rdf:RDF>",
+        {},
+    ),
+    (
+        "charset-conflict-falls-back",
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><item><title>T</title>'
+        "<link>https://a.example.com/</link></item></channel></rss>",
+        {"content-type": "application/rss+xml; charset=iso-8859-1"},
+    ),
+]
+
+
+def _feedparser_records(body: bytes, headers: Dict[str, str]) -> List[Record]:
+    parsed = feedparser.parse(body, response_headers=headers)
+    records = []
+    for entry in parsed.entries:
+        article = _parse_entry(entry, "parity")
+        published = article.published.isoformat() if article.published else None
+        records.append((article.title, article.link, published, article.text))
+    return records
+
+
+def _fast_records(body: bytes, headers: Dict[str, str]) -> List[Record]:
+    entries, _ = parse(body, headers)
+    return [
+        (
+            "(no title)" if e.title is None else e.title,
+            e.link,
+            e.published.isoformat() if e.published else None,
+            summary_text(e.summary),
+        )
+        for e in entries
+    ]
+
+
+def check(name: str, body: bytes, headers: Dict[str, str]) -> bool:
+    """
+    Compare both parsers on one feed and print a line; False on mismatch.
+    """
+    start = time.perf_counter()
+    expected = _feedparser_records(body, headers)
+    slow = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        actual = _fast_records(body, headers)
+    except UnsupportedFeed as exc:
+        print(f"fallback  {name}: {exc}")
+        return True
+    fast = time.perf_counter() - start
+
+    speedup = slow / fast if fast else float("inf")
+    if actual == expected:
+        print(f"ok        {name}: {len(actual)} entries, {slow * 1000:.1f}ms -> {fast * 1000:.1f}ms ({speedup:.1f}x)")
+        return True
+
+    print(f"MISMATCH  {name}: fast {len(actual)} vs feedparser {len(expected)} entries")
+    for i, (a, e) in enumerate(zip(actual, expected)):
+        if a != e:
+            for field, x, y in zip(("title", "link", "published", "text"), a, e):
+                if x != y:
+                    print(f"  entry {i} {field}: fast {x!r}\n  {'':>{len(str(i)) + 7}} feedparser {y!r}")
+            break
+    return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="synthetic feed sizes")
+    parser.add_argument("--snapshot", help="also check every feed in this recorded snapshot")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        entries = generate_entries(size)
+        ok &= check(f"synthetic-rss-{size}", to_rss(entries), {})
+        ok &= check(f"synthetic-atom-{size}", to_atom(entries), {})
+
+    for name, body, headers in EDGE_CASES:
+        ok &= check(name, body.encode("utf-8"), headers)
+
+    if args.snapshot:
+        from src import config
+        from src.snapshots import SnapshotStore
+
+        store = SnapshotStore(config.SNAPSHOT_DIR, args.snapshot)
+        for url in store:
+            status, body, headers = store.replay(url)
+            if status == 200 and body:
+                ok &= check(url, body, headers)
+
+    print("parity OK" if ok else "parity FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
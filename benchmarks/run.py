@@ -0,0 +1,234 @@
+# benchmarks/run.py
+"""
+Microbenchmarks for the parse, filter and render stages on synthetic corpora.
+
+Run from the project root, e.g.:
+
+    python -m benchmarks.run --sizes 100,1000,10000 --output bench.json
+    python -m benchmarks.run --snapshot 2025-01-15   # real feeds, see src/snapshots.py
+
+Each stage is timed (best of --repeat runs, no tracing) and then run once more
+under tracemalloc for peak memory. Results are written as JSON so runs from
+different commits can be diffed. Parsing is timed through scraper._parse_body,
+the path fetches take (the fast parser when FAST_PARSE is on), with the
+feedparser path beside it as *_feedparser.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import feedparser
+
+from src import config, email_builder
+from src.config import MACRO_KEYWORDS, MAX_ARTICLES
+from src.email_builder import build_html_email, build_text_email
+from src.filter import filter_articles
+from src.scraper import Article, _parse_body, _parse_entry
+
+from .corpus import generate_entries, to_atom, to_rss
+
+SUBJECT = "Daily Macro Brief — benchmark"
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _parse(
+    body: bytes, source: str = "synthetic", headers: Dict[str, str] | None = None
+) -> List[Article]:
+    # The shipped path: the streaming fast path when FAST_PARSE is on
+    return _parse_body(body, headers or {}, source)[0]
+
+
+def _parse_feedparser(body: bytes, source: str = "synthetic") -> List[Article]:
+    parsed = feedparser.parse(body)
+    return [_parse_entry(entry, source) for entry in parsed.entries]
+
+
+def _render_cold(render: Callable[[str, List[Article]], str], articles: List[Article]) -> str:
+    # Measure a full render, not the per-article fragment cache
+    email_builder._fragment_cache.clear()
+    return render(SUBJECT, articles)
+
+
+def _recorder(results: List[Dict[str, Any]], repeat: int) -> Callable[..., None]:
+    def record(stage: str, size: int, items: int, fn: Callable[[], Any]) -> None:
+        stats = _measure(fn, repeat)
+        stats.update(
+            stage=stage,
+            size=size,
+            items_per_second=items / stats["seconds"] if stats["seconds"] else None,
+        )
+        results.append(stats)
+        print(
+            f"{stage:<26} n={size:<7} {stats['seconds'] * 1000:10.1f} ms "
+            f"{stats['items_per_second'] or 0:12.0f} items/s "
+            f"peak {stats['peak_bytes'] / 1024:10.0f} KiB",
+            file=sys.stderr,
+        )
+
+    return record
+
+
+def _filter_and_render(record: Callable[..., None], size: int, articles: List[Article]) -> None:
+    record(
+        "filter",
+        size,
+        len(articles),
+        lambda: filter_articles(articles, MACRO_KEYWORDS, max_articles=MAX_ARTICLES),
+    )
+
+    record(
+        "filter_bm25",
+        size,
+        len(articles),
+        lambda: filter_articles(
+            articles,
+            MACRO_KEYWORDS,
+            max_articles=MAX_ARTICLES,
+            ranking="bm25",
+            half_life_hours=24,
+        ),
+    )
+
+    # Render every article so render cost scales with the corpus
+    record("render_html", size, len(articles), lambda: _render_cold(build_html_email, articles))
+    record("render_text", size, len(articles), lambda: _render_cold(build_text_email, articles))
+
+
+def run_benchmarks(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    record = _recorder(results, repeat)
+
+    for size in sizes:
+        entries = generate_entries(size)
+        rss = to_rss(entries)
+        atom = to_atom(entries)
+
+        # The shipped parser next to the feedparser path it falls back to
+        record("parse_rss", size, size, lambda: _parse(rss))
+        record("parse_rss_feedparser", size, size, lambda: _parse_feedparser(rss))
+        record("parse_atom", size, size, lambda: _parse(atom))
+        record("parse_atom_feedparser", size, size, lambda: _parse_feedparser(atom))
+
+        _filter_and_render(record, size, _parse(rss))
+
+    return results
+
+
+def run_snapshot_benchmarks(name: str, repeat: int) -> List[Dict[str, Any]]:
+    """
+    The same stages on a recorded snapshot of the real feeds. `size` is the
+    total number of entries across all feeds.
+    """
+    from src.config import SNAPSHOT_DIR
+    from src.snapshots import SnapshotStore
+
+    store = SnapshotStore(SNAPSHOT_DIR, name)
+    responses = [(url, store.replay(url)) for url in store]
+    bodies = [
+        (url, body, headers) for url, (status, body, headers) in responses if status == 200 and body
+    ]
+    if not bodies:
+        raise SystemExit(f"Snapshot {name} has no feed bodies under {SNAPSHOT_DIR}")
+
+    def parse_all() -> List[Article]:
+        return [a for url, body, headers in bodies for a in _parse(body, url, headers)]
+
+    articles = parse_all()
+    size = len(articles)
+    results: List[Dict[str, Any]] = []
+    record = _recorder(results, repeat)
+    record("parse_snapshot", size, size, parse_all)
+    record(
+        "parse_snapshot_feedparser",
+        size,
+        size,
+        lambda: [a for url, body, _ in bodies for a in _parse_feedparser(body, url)],
+    )
+    _filter_and_render(record, size, articles)
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default="100,1000,10000",
+        help="comma-separated corpus sizes (entries), e.g. 100,1000,10000,100000",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument("--output", help="write JSON results to this path (default: stdout)")
+    parser.add_argument(
+        "--snapshot",
+        help="benchmark a recorded snapshot of the real feeds (by name) instead of synthetic corpora",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "feedparser": feedparser.__version__,
+            "fast_parse": config.FAST_PARSE,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "repeat": args.repeat,
+            "snapshot": args.snapshot,
+        },
+        "results": (
+            run_snapshot_benchmarks(args.snapshot, args.repeat)
+            if args.snapshot
+            else run_benchmarks(sizes, args.repeat)
+        ),
+    }
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
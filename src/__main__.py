@@ -0,0 +1,4 @@
+# src/__main__.py
+from .cli import main
+
+main()
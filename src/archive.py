@@ -0,0 +1,293 @@
+# src/archive.py
+"""
+Static archive of past issues for GitHub Pages.
+
+Layout under ARCHIVE_DIR (default: archive/):
+
+    manifest.json            date -> {hash, subject, count}
+    index.html               list of years + latest issues
+    <year>.html              every issue of that year
+    <date>.html              the issue page itself
+    issues/<date>.json       the issue's articles (also used by search)
+    search/<c>.json          inverted index shard for tokens starting with c:
+                             token -> {date: [article indices]}
+    search.html              client-side search over the shards
+
+Updates are incremental: an issue whose content hash is unchanged is skipped,
+and only the year page, the root index and the search shards touched by a
+changed issue are rewritten.
+"""
+from __future__ import annotations
+
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+
+from .email_builder import TEMPLATE_VERSION
+from .optimize import render_web
+from .scraper import Article, article_to_dict
+
+ARCHIVE_VERSION = "1"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or "
+    "that the this to was were will with after over says said new".split()
+)
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Search tokens: lower-case alphanumeric words of 2+ chars, minus stopwords.
+    Must stay in sync with the tokenizer in search.html.
+    """
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS}
+
+
+def _shard_name(token: str) -> str:
+    return token[0]
+
+
+def _article_tokens(article: Dict) -> Set[str]:
+    return tokenize(f"{article.get('title', '')} {article.get('text', '')} {article.get('source', '')}")
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _dump(data) -> str:
+    # Compact: these files are fetched by the browser
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+class Archive:
+    def __init__(self, directory: str | Path, title: str = "Daily Macro Brief", asset_base: str = "../"):
+        # asset_base: the issue pages' path to the site root, where the logo
+        # is; by default the archive sits one directory below it
+        self.directory = Path(directory)
+        self.title = title
+        self.asset_base = asset_base
+        self.manifest_path = self.directory / "manifest.json"
+        self.manifest: Dict[str, Dict] = _read_json(self.manifest_path, {})
+
+    def _issue_path(self, date: str) -> Path:
+        return self.directory / "issues" / f"{date}.json"
+
+    def _content_hash(self, subject: str, articles: List[Dict]) -> str:
+        payload = json.dumps(
+            [ARCHIVE_VERSION, TEMPLATE_VERSION, self.asset_base, subject, articles],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def add_issue(self, date: str, subject: str, articles: Iterable[Article]) -> bool:
+        """
+        Add or update the issue for `date` (YYYY-MM-DD).
+        Returns False without touching any file if its content is unchanged.
+        """
+        return bool(self.add_issues([(date, subject, articles)]))
+
+    def add_issues(self, issues: Iterable[Tuple[str, str, Iterable[Article]]]) -> List[str]:
+        """
+        Add or update several (date, subject, articles) issues at once, e.g.
+        when backfilling. Each touched search shard, year page and index is
+        written once per call. Returns the dates that changed.
+        """
+        changed: List[str] = []
+        old_tokens: Dict[str, Set[str]] = {}
+        new_postings: Dict[str, Dict[str, List[int]]] = {}
+
+        for date, subject, articles in issues:
+            article_list = list(articles)
+            records = [article_to_dict(a) for a in article_list]
+            content_hash = self._content_hash(subject, records)
+            previous = self.manifest.get(date)
+            if previous and previous.get("hash") == content_hash:
+                logging.info("Archive issue %s unchanged; skipping", date)
+                continue
+
+            if previous:
+                old_records = _read_json(self._issue_path(date), {}).get("articles", [])
+                old_tokens[date] = set().union(*map(_article_tokens, old_records))
+            postings = new_postings.setdefault(date, {})
+            for i, record in enumerate(records):
+                for token in _article_tokens(record):
+                    postings.setdefault(token, []).append(i)
+
+            _write(self._issue_path(date), _dump({"date": date, "subject": subject, "articles": records}))
+            _write(self.directory / f"{date}.html", render_web(subject, article_list, self.asset_base))
+            self.manifest[date] = {"hash": content_hash, "subject": subject, "count": len(records)}
+            changed.append(date)
+            logging.info("Archived issue %s (%d articles)", date, len(records))
+
+        if not changed:
+            return changed
+
+        self._update_search(old_tokens, new_postings)
+        for year in sorted({d[:4] for d in changed}):
+            self._write_year_page(year)
+        self._write_root_index()
+        self._write_search_page()
+        _write(self.manifest_path, json.dumps(self.manifest, indent=1, sort_keys=True))
+        return changed
+
+    def _update_search(
+        self,
+        old_tokens: Dict[str, Set[str]],
+        new_postings: Dict[str, Dict[str, List[int]]],
+    ) -> None:
+        """
+        Replace the changed dates' postings in the inverted index. A posting
+        list maps date -> article indices within that issue; only shards
+        holding tokens the changed issues had before or have now are loaded
+        and rewritten.
+        """
+        touched: Dict[str, Set[str]] = {}
+        for tokens in list(old_tokens.values()) + [set(p) for p in new_postings.values()]:
+            for token in tokens:
+                touched.setdefault(_shard_name(token), set()).add(token)
+
+        for shard, tokens in touched.items():
+            path = self.directory / "search" / f"{shard}.json"
+            index: Dict[str, Dict[str, List[int]]] = _read_json(path, {})
+            for token in tokens:
+                postings = index.get(token, {})
+                for date, had in old_tokens.items():
+                    if token in had:
+                        postings.pop(date, None)
+                for date, issue_postings in new_postings.items():
+                    if token in issue_postings:
+                        postings[date] = issue_postings[token]
+                if postings:
+                    index[token] = postings
+                else:
+                    index.pop(token, None)
+            _write(path, _dump(index))
+
+    def _issue_links(self, dates: Sequence[str]) -> str:
+        return "\n".join(
+            f'<li><a href="{d}.html">{escape(d)}</a> — '
+            f'{escape(self.manifest[d]["subject"])} ({self.manifest[d]["count"]} stories)</li>'
+            for d in dates
+        )
+
+    def _write_year_page(self, year: str) -> None:
+        dates = sorted((d for d in self.manifest if d.startswith(year)), reverse=True)
+        body = f'<p><a href="index.html">All years</a></p>\n<ul>\n{self._issue_links(dates)}\n</ul>'
+        _write(self.directory / f"{year}.html", _page(f"{self.title} — {year}", body))
+
+    def _write_root_index(self, latest: int = 14) -> None:
+        dates = sorted(self.manifest, reverse=True)
+        years = sorted({d[:4] for d in dates}, reverse=True)
+        year_links = " · ".join(f'<a href="{y}.html">{y}</a>' for y in years)
+        body = (
+            '<p><a href="search.html">Search all issues</a></p>\n'
+            f"<p>{year_links}</p>\n<h2>Latest issues</h2>\n"
+            f"<ul>\n{self._issue_links(dates[:latest])}\n</ul>"
+        )
+        _write(self.directory / "index.html", _page(f"{self.title} — Archive", body))
+
+    def _write_search_page(self) -> None:
+        path = self.directory / "search.html"
+        if path.exists() and f"archive-version:{ARCHIVE_VERSION}" in path.read_text(encoding="utf-8"):
+            return
+        _write(path, _page(f"{self.title} — Search", _SEARCH_BODY))
+
+
+def _page(title: str, body: str) -> str:
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8" />
+  <title>{escape(title)}</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <!-- archive-version:{ARCHIVE_VERSION} -->
+  <style>
+    body {{ margin: 0; padding: 24px 12px; background: #020617; color: #e5e7eb;
+           font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif; }}
+    main {{ max-width: 720px; margin: 0 auto; }}
+    a {{ color: #93c5fd; }}
+    li {{ margin: 6px 0; font-size: 14px; }}
+    input {{ width: 100%; padding: 8px; font-size: 15px; border-radius: 8px; border: 1px solid #374151; }}
+  </style>
+</head>
+<body>
+<main>
+<h1>{escape(title)}</h1>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+_SEARCH_BODY = """<p><a href="index.html">Archive</a></p>
+<input id="q" type="search" placeholder="e.g. ecb rate cut" autofocus />
+<ul id="results"></ul>
+<script>
+const STOP = new Set("a an and are as at be by for from has have in into is it its of on or that the this to was were will with after over says said new".split(" "));
+const tokenize = (s) => [...new Set((s.toLowerCase().match(/[a-z0-9]+/g) || []).filter(w => w.length > 1 && !STOP.has(w)))];
+const shards = {}, issues = {};
+const getJSON = (url, cache, key) => cache[key] || (cache[key] = fetch(url).then(r => r.ok ? r.json() : {}));
+async function search(query) {
+  const tokens = tokenize(query);
+  if (!tokens.length) return [];
+  let hits = null;
+  for (const t of tokens) {
+    const shard = await getJSON(`search/${t[0]}.json`, shards, t[0]);
+    const postings = new Set();
+    for (const [date, ids] of Object.entries(shard[t] || {})) ids.forEach(i => postings.add(`${date}:${i}`));
+    hits = hits === null ? postings : new Set([...hits].filter(p => postings.has(p)));
+    if (!hits.size) return [];
+  }
+  return [...hits].sort().reverse().slice(0, 50);
+}
+const esc = (s) => String(s).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+let pending = 0;
+document.getElementById("q").addEventListener("input", async (e) => {
+  const ticket = ++pending;
+  const hits = await search(e.target.value);
+  const items = [];
+  for (const hit of hits) {
+    const [date, i] = hit.split(":");
+    const issue = await getJSON(`issues/${date}.json`, issues, date);
+    const a = (issue.articles || [])[+i];
+    if (a) items.push(`<li>${esc(date)} — <a href="${esc(a.link)}">${esc(a.title)}</a> <small>(${esc(a.source)})</small></li>`);
+  }
+  if (ticket === pending) document.getElementById("results").innerHTML = items.join("");
+});
+</script>"""
+
+
+def archive_issue(
+    date: str,
+    subject: str,
+    articles: Iterable[Article],
+    directory: Optional[str | Path] = None,
+) -> bool:
+    """
+    Add today's brief to the archive in `directory` (default: ARCHIVE_DIR).
+    """
+    from . import config
+
+    archive = Archive(directory or config.ARCHIVE_DIR, title=config.NEWSLETTER_SUBJECT)
+    return archive.add_issue(date, subject, articles)
@@ -0,0 +1,320 @@
+# src/artifacts.py
+"""
+Content-addressed cache of stage outputs, so a second process working from
+the same inputs (the workflow's page build, then the send) reuses the first
+one's work instead of redoing it.
+
+Artifacts live under ARTIFACT_DIR as filter/<key>.json and render/<key>/
+(one file per format, streamed there by formats.render_formats), where the
+key is a hash of everything the stage's output depends on:
+
+- filter: the fetched articles (which stand in for the feed bodies: the
+  same bodies always parse to the same articles, cached or not), every
+  edition's keywords and cap, the ranking / dedupe settings and the time
+  window (to the hour). With an article store (ARTICLE_DB) the result also
+  depends on what has been sent so far, so those runs always filter afresh.
+- render: the selected articles, the subject, TEMPLATE_VERSION,
+  EMAIL_BYTE_BUDGET and SITE_URL (which the feeds link to).
+
+Fetching itself is not skipped (only a request tells us whether a feed
+changed), but with the feed cache an unchanged feed costs a 304 and no
+parse.
+
+write_if_changed and copy_if_changed leave a page untouched when its
+content is the same, so the workflow's commit step finds nothing to do.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Iterable, List, Optional, Sequence
+import atexit
+import filecmp
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from . import config
+from .editions import Edition
+from .scraper import Article, article_from_dict, article_to_dict
+
+if TYPE_CHECKING:
+    from .store import ArticleStore
+
+# Bump when the layout of stored artifacts changes
+ARTIFACT_VERSION = "4"
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable parts (datetimes via str).
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{ARTIFACT_VERSION}:{payload}".encode("utf-8")).hexdigest()
+
+
+def articles_fingerprint(articles: Iterable[Article]) -> str:
+    """
+    Hash of the fields a feed provides (not the ones filtering fills in).
+    """
+    digest = hashlib.sha256()
+    for a in articles:
+        published = a.published.isoformat() if a.published else ""
+        for value in (a.title, a.link, a.source, published, a.summary):
+            digest.update(value.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+class StagedFile:
+    """
+    An output file written through a temporary file next to `path`, then
+    swapped in by commit() unless the content is unchanged.
+    """
+
+    def __init__(self, path: str | Path, binary: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._file: IO = open(self._tmp_path, "wb") if binary else open(self._tmp_path, "w", encoding="utf-8")
+        self.write = self._file.write
+        self.flush = self._file.flush
+
+    def commit(self) -> bool:
+        """
+        Replace the target with what was written; returns whether it changed.
+        """
+        self._file.close()
+        if self.path.exists() and filecmp.cmp(self._tmp_path, self.path, shallow=False):
+            self._tmp_path.unlink()
+            logging.info("%s unchanged; not rewriting", self.path)
+            return False
+        os.replace(self._tmp_path, self.path)
+        return True
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class ArtifactCache:
+    def __init__(self, directory: str | Path, keep: int = 20):
+        self.directory = Path(directory)
+        # Artifacts kept per stage; older ones are pruned on write
+        self.keep = keep
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.directory / stage / f"{key}.json"
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(stage, key), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logging.warning("Ignoring unreadable %s artifact %s: %s", stage, key[:12], exc)
+            return None
+        logging.info("Reusing %s artifact %s", stage, key[:12])
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        path = self._path(stage, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+            self.prune(stage)
+        except OSError as exc:
+            logging.warning("Could not write %s artifact: %s", stage, exc)
+
+    def prune(self, stage: str) -> None:
+        """
+        Keep only the `keep` most recently used artifacts (files or
+        directories) of `stage`.
+        """
+        stage_dir = self.directory / stage
+        artifacts = sorted(
+            (p for p in stage_dir.iterdir() if not p.name.endswith(".tmp")),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for old in artifacts[self.keep :]:
+            if old.is_dir():
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                old.unlink(missing_ok=True)
+
+
+def artifact_cache() -> Optional[ArtifactCache]:
+    """
+    The cache at ARTIFACT_DIR, or None when it is disabled (empty).
+    """
+    return ArtifactCache(config.ARTIFACT_DIR) if config.ARTIFACT_DIR else None
+
+
+def _hour(dt: Optional[datetime]) -> Optional[str]:
+    return dt.replace(minute=0, second=0, microsecond=0).isoformat() if dt else None
+
+
+def cached_selections(
+    articles: Iterable[Article],
+    editions: Sequence[Edition],
+    store: Optional["ArticleStore"] = None,
+) -> List[List[Article]]:
+    """
+    select_editions, reusing a previous result for the same articles and
+    settings. A stream (STREAM_PIPELINE) can't be hashed up front, and with
+    a store the result depends on what was already sent, so both are always
+    filtered afresh.
+    """
+    from .filter import select_editions
+    from .timeindex import window_start
+
+    cache = artifact_cache()
+    if cache is None or store is not None or not isinstance(articles, list):
+        return select_editions(articles, editions, store=store)
+
+    since = window_start(config.TIME_WINDOW, last_issue_path=config.LAST_ISSUE_PATH)
+    key = fingerprint(
+        articles_fingerprint(articles),
+        [(e.name, e.keywords, e.max_articles) for e in editions],
+        config.RANKING,
+        config.KEYWORD_WEIGHTS,
+        config.RECENCY_HALF_LIFE_HOURS,
+        config.NEAR_DUPLICATE_THRESHOLD,
+        config.DEDUPE_HISTORY_DAYS,
+        _hour(since),
+    )
+    cached = cache.get("filter", key)
+    if cached is not None:
+        return [[article_from_dict(d) for d in selected] for selected in cached]
+
+    selections = select_editions(articles, editions, store=store)
+    cache.put("filter", key, [[article_to_dict(a) for a in selected] for selected in selections])
+    return selections
+
+
+@dataclass
+class RenderedBrief:
+    """
+    Files holding every format of one brief (see formats.stream_brief), and
+    how many of the articles fit in the email.
+    """
+    html: Path
+    text: Path
+    web: Path
+    json_feed: Path
+    # None without SITE_URL, which the RSS channel needs
+    rss: Optional[Path]
+    kept: int
+
+
+def cached_render(subject: str, articles: Sequence[Article], asset_base: str = "") -> RenderedBrief:
+    """
+    Every format of one brief, streamed into files by a single
+    formats.render_formats pass and reused when nothing it depends on
+    changed. The files live under ARTIFACT_DIR/render/<key>/, or in a
+    temporary directory (removed at exit) when the cache is disabled.
+    `asset_base` is as for formats.stream_brief.
+    """
+    from .email_builder import TEMPLATE_VERSION
+    from .formats import JSON_FEED_NAME, RSS_NAME, render_formats
+
+    cache = artifact_cache()
+    key = fingerprint(
+        subject,
+        [article_to_dict(a) for a in articles],
+        TEMPLATE_VERSION,
+        config.EMAIL_BYTE_BUDGET,
+        config.SITE_URL,
+        asset_base,
+    )
+    if cache is not None:
+        directory = cache.directory / "render" / key
+    else:
+        directory = Path(tempfile.mkdtemp(prefix="brief-"))
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    rss = directory / RSS_NAME
+    meta = directory / "meta.json"
+
+    def rendered(kept: int) -> RenderedBrief:
+        return RenderedBrief(
+            html=directory / "email.html",
+            text=directory / "email.txt",
+            web=directory / "web.html",
+            json_feed=directory / JSON_FEED_NAME,
+            rss=rss if rss.exists() else None,
+            kept=kept,
+        )
+
+    # meta.json is written last, so its presence means the rest is complete
+    if cache is not None and meta.exists():
+        try:
+            kept = json.loads(meta.read_text(encoding="utf-8"))["kept"]
+        except (OSError, ValueError, KeyError) as exc:
+            logging.warning("Ignoring unreadable render artifact %s: %s", key[:12], exc)
+        else:
+            logging.info("Reusing render artifact %s", key[:12])
+            os.utime(directory)
+            return rendered(kept)
+
+    brief = rendered(0)
+    kept = render_formats(
+        subject,
+        articles,
+        html=brief.html,
+        text=brief.text,
+        web=brief.web,
+        json_feed=brief.json_feed,
+        rss=rss,
+        asset_base=asset_base,
+    )
+    write_if_changed(meta, json.dumps({"kept": kept}))
+    if cache is not None:
+        cache.prune("render")
+    return rendered(kept)
+
+
+def copy_if_changed(source: str | Path, path: str | Path) -> bool:
+    """
+    Copy the file at `source` to `path` (via a temporary file) unless `path`
+    already holds the same bytes; returns whether it wrote.
+    """
+    source, path = Path(source), Path(path)
+    if path.exists() and filecmp.cmp(source, path, shallow=False):
+        logging.info("%s unchanged; not rewriting", path)
+        return False
+    output = StagedFile(path, binary=True)
+    try:
+        with open(source, "rb") as f:
+            shutil.copyfileobj(f, output)
+    except BaseException:
+        output.abort()
+        raise
+    return output.commit()
+
+
+def write_if_changed(path: str | Path, content: str | bytes) -> bool:
+    """
+    Write `content` to `path` unless it already holds exactly that; returns
+    whether it wrote.
+    """
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            logging.info("%s unchanged; not rewriting", path)
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
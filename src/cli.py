@@ -0,0 +1,249 @@
+# src/cli.py
+"""
+Single entry point for the pipeline, one subcommand per step:
+
+    python -m src fetch    # feeds -> .cache/pipeline/articles.json
+    python -m src filter   # articles.json -> selected.json
+    python -m src render   # selected.json -> brief.html / brief.txt / feed.json / feed.xml
+    python -m src send     # brief.html / brief.txt -> SendGrid
+    python -m src archive  # selected.json -> archive/ (pages + search index)
+    python -m src daemon   # poll feeds on adaptive schedules, re-render on news
+    python -m src run      # the whole pipeline (same as python -m src.main)
+
+Each subcommand imports only the modules it needs, and settings are read
+lazily, so e.g. `render` never pays for importing feedparser or sendgrid.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from . import config
+
+if TYPE_CHECKING:
+    from .scraper import Article
+
+PIPELINE_DIR = config.BASE_DIR / ".cache" / "pipeline"
+
+
+def _configure_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+
+
+def _default_subject() -> str:
+    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return f"{config.NEWSLETTER_SUBJECT} — {today_str}"
+
+
+def _issue_date(value: str) -> str:
+    # Issue dates name files under ARCHIVE_DIR and are grouped by year, so
+    # only real YYYY-MM-DD dates are accepted
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {value!r}") from None
+
+
+def _write_articles(path: Path, articles: List["Article"]) -> None:
+    from .scraper import article_to_dict
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([article_to_dict(a) for a in articles], f)
+    logging.info("Wrote %d articles to %s", len(articles), path)
+
+
+def _read_articles(path: Path) -> List["Article"]:
+    from .scraper import article_from_dict
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [article_from_dict(d) for d in json.load(f)]
+
+
+def cmd_fetch(args: argparse.Namespace) -> None:
+    from .scraper import fetch_all_feeds
+
+    articles = fetch_all_feeds(args.feeds or config.FEED_URLS)
+    _write_articles(args.output, articles)
+
+
+def cmd_filter(args: argparse.Namespace) -> None:
+    from .filter import select_articles
+
+    selected = select_articles(_read_articles(args.input), max_articles=args.max_articles)
+    _write_articles(args.output, selected)
+
+
+def cmd_render(args: argparse.Namespace) -> None:
+    from .artifacts import copy_if_changed
+    from .formats import render_formats
+    from .optimize import precompress
+
+    articles = _read_articles(args.input)
+    subject = args.subject or _default_subject()
+
+    # Every format in one pass; further outputs of a kind are copies of the first
+    first_html, *more_html = args.html
+    first_page, *more_pages = args.web or [None]
+    render_formats(
+        subject,
+        articles,
+        html=first_html,
+        text=args.text,
+        web=first_page,
+        json_feed=args.json_feed,
+        rss=args.rss,
+    )
+    for path in more_html:
+        copy_if_changed(first_html, path)
+    for path in more_pages:
+        copy_if_changed(first_page, path)
+    for path in args.web:
+        precompress(path)
+
+
+def cmd_send(args: argparse.Namespace) -> None:
+    from .editions import load_editions
+    from .send_email import send_newsletter
+    from .timeindex import mark_issue
+
+    # The rendered files are one brief, so they go to one edition's
+    # recipients: --edition, or the first edition (TO_EMAILS without
+    # EDITIONS_FILE)
+    editions = {e.name: e for e in load_editions()}
+    name = args.edition or next(iter(editions))
+    if name not in editions:
+        raise SystemExit(f"Unknown edition {name!r}; EDITIONS_FILE has: {', '.join(editions)}")
+    edition = editions[name]
+
+    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    subject = args.subject or f"{edition.subject} — {today_str}"
+    html_body = args.html.read_text(encoding="utf-8")
+    text_body = args.text.read_text(encoding="utf-8")
+    send_newsletter(edition.recipients, subject, html_body, text_body)
+    mark_issue(config.LAST_ISSUE_PATH)
+
+
+def cmd_archive(args: argparse.Namespace) -> None:
+    from .archive import Archive
+
+    date = args.date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    subject = args.subject or f"{config.NEWSLETTER_SUBJECT} — {date}"
+    archive = Archive(args.directory or config.ARCHIVE_DIR, title=config.NEWSLETTER_SUBJECT)
+    archive.add_issue(date, subject, _read_articles(args.input))
+
+
+def cmd_daemon(args: argparse.Namespace) -> None:
+    from .daemon import run_daemon
+
+    run_daemon(args.html, args.text, args.page)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    from .main import run
+
+    run()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Daily Macro Brief pipeline.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    articles_path = PIPELINE_DIR / "articles.json"
+    selected_path = PIPELINE_DIR / "selected.json"
+    html_path = PIPELINE_DIR / "brief.html"
+    text_path = PIPELINE_DIR / "brief.txt"
+    json_feed_path = PIPELINE_DIR / "feed.json"
+    rss_path = PIPELINE_DIR / "feed.xml"
+
+    p = sub.add_parser("fetch", help="fetch all feeds and save the parsed articles")
+    p.add_argument("--feeds", nargs="*", help="feed URLs (default: FEED_URLS)")
+    p.add_argument("--output", type=Path, default=articles_path)
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("filter", help="keep the macro-relevant articles")
+    p.add_argument("--input", type=Path, default=articles_path)
+    p.add_argument("--output", type=Path, default=selected_path)
+    p.add_argument("--max-articles", type=int, help="default: MAX_ARTICLES")
+    p.set_defaults(func=cmd_filter)
+
+    p = sub.add_parser("render", help="render the HTML, text, JSON Feed and RSS brief")
+    p.add_argument("--input", type=Path, default=selected_path)
+    p.add_argument(
+        "--html",
+        type=Path,
+        nargs="+",
+        default=[html_path],
+        help="one or more email HTML outputs, e.g. --html brief.html preview.html",
+    )
+    p.add_argument("--text", type=Path, default=text_path)
+    p.add_argument(
+        "--web",
+        type=Path,
+        nargs="*",
+        default=[],
+        help="web view pages, written with .gz/.br copies, e.g. --web index.html",
+    )
+    p.add_argument("--json-feed", type=Path, default=json_feed_path, help="JSON Feed of the brief")
+    p.add_argument("--rss", type=Path, default=rss_path, help="RSS 2.0 feed of the brief")
+    p.add_argument("--subject", help="default: NEWSLETTER_SUBJECT — today's date")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("send", help="send the rendered brief to one edition's recipients via SendGrid")
+    p.add_argument("--html", type=Path, default=html_path)
+    p.add_argument("--text", type=Path, default=text_path)
+    p.add_argument(
+        "--edition",
+        help="edition (EDITIONS_FILE) whose recipients and subject to use (default: the first, "
+        "i.e. TO_EMAILS without EDITIONS_FILE)",
+    )
+    p.add_argument("--subject", help="default: the edition's subject — today's date")
+    p.set_defaults(func=cmd_send)
+
+    p = sub.add_parser("archive", help="add the selected articles to the static archive")
+    p.add_argument("--input", type=Path, default=selected_path)
+    p.add_argument("--date", type=_issue_date, help="issue date, YYYY-MM-DD (default: today, UTC)")
+    p.add_argument("--directory", type=Path, help="default: ARCHIVE_DIR")
+    p.add_argument("--subject", help="default: NEWSLETTER_SUBJECT — issue date")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("daemon", help="poll feeds continuously and re-render the brief")
+    p.add_argument("--html", type=Path, nargs="+", default=[html_path], help="email HTML outputs")
+    p.add_argument("--text", type=Path, default=text_path)
+    p.add_argument(
+        "--page",
+        type=Path,
+        nargs="*",
+        default=[],
+        help="web view pages, written with .gz/.br copies, e.g. --page index.html",
+    )
+    p.set_defaults(func=cmd_daemon)
+
+    p = sub.add_parser("run", help="fetch, filter, render and send in one go")
+    p.set_defaults(func=cmd_run)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command != "run":
+        # run configures its own logging
+        _configure_logging()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
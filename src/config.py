@@ -2,19 +2,58 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from typing import Any, Callable, Dict, List
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 # -------------------------------------------------
-# Base setup: load .env from project root
+# Base setup: settings are read lazily
 # -------------------------------------------------
+#
+# Importing this module is cheap: .env is loaded (and python-dotenv imported)
+# only when the first setting is read, and each setting is computed from the
+# environment on first access, then cached as a normal module attribute.
+# Read settings as `config.NAME` at call time to keep imports fast.
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-env_path = BASE_DIR / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+
+_SETTINGS: Dict[str, Callable[[], Any]] = {}
+_env_loaded = False
+
+
+def _load_env() -> None:
+    """
+    Load .env from project root, once.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    env_path = BASE_DIR / ".env"
+    if env_path.exists():
+        from dotenv import load_dotenv
+
+        load_dotenv(env_path)
+
+
+def _lazy(name: str, factory: Callable[[], Any]) -> None:
+    """
+    Register a setting computed from the environment on first access.
+    """
+    _SETTINGS[name] = factory
+
+
+def __getattr__(name: str) -> Any:
+    factory = _SETTINGS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _load_env()
+    value = factory()
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_SETTINGS))
 
 
 def _split_csv(value: str) -> List[str]:
@@ -26,13 +65,39 @@ def _split_csv(value: str) -> List[str]:
     return [v.strip() for v in value.split(",") if v.strip()]
 
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    """
+    Helper: read a boolean flag such as "1", "true", "yes" / "0", "false", "no".
+    """
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
 # -------------------------------------------------
 # SendGrid / email config
 # -------------------------------------------------
 
-SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
-FROM_EMAIL = os.getenv("FROM_EMAIL", "")
-TO_EMAILS = _split_csv(os.getenv("TO_EMAILS", ""))
+_lazy("SENDGRID_API_KEY", lambda: os.getenv("SENDGRID_API_KEY", ""))
+_lazy("FROM_EMAIL", lambda: os.getenv("FROM_EMAIL", ""))
+_lazy("TO_EMAILS", lambda: _split_csv(os.getenv("TO_EMAILS", "")))
+
+# Override to point at a local fake endpoint when testing delivery
+_lazy("SENDGRID_HOST", lambda: os.getenv("SENDGRID_HOST", "https://api.sendgrid.com"))
+
+# Recipients per request (SendGrid caps personalizations at 1000)
+_lazy("SENDGRID_BATCH_SIZE", lambda: int(os.getenv("SENDGRID_BATCH_SIZE", "1000")))
+
+# Batches sent in parallel over one client
+_lazy("SENDGRID_WORKERS", lambda: int(os.getenv("SENDGRID_WORKERS", "4")))
+
+# Retries for 429 / 5xx / network errors, with exponential backoff (base seconds)
+_lazy("SENDGRID_MAX_RETRIES", lambda: int(os.getenv("SENDGRID_MAX_RETRIES", "4")))
+_lazy("SENDGRID_BACKOFF", lambda: float(os.getenv("SENDGRID_BACKOFF", "1.0")))
+
+# Socket timeout (seconds) for each SendGrid request
+_lazy("SENDGRID_TIMEOUT", lambda: float(os.getenv("SENDGRID_TIMEOUT", "30")))
 
 
 # -------------------------------------------------
@@ -69,104 +134,269 @@ DEFAULT_FEED_URLS = [
     "https://www.bis.org/doclist/cbspeeches.rss",
 ]
 
-FEED_URLS = _split_csv(os.getenv("FEED_URLS", "")) or DEFAULT_FEED_URLS
+_lazy("FEED_URLS", lambda: _split_csv(os.getenv("FEED_URLS", "")) or DEFAULT_FEED_URLS)
+
+
+# -------------------------------------------------
+# Feed fetching – concurrency & timeouts
+# -------------------------------------------------
+
+# Number of feeds fetched in parallel (1 = fetch one feed at a time)
+_lazy("FETCH_WORKERS", lambda: int(os.getenv("FETCH_WORKERS", "8")))
+
+# Socket timeout (seconds) for a single feed request
+_lazy("FEED_TIMEOUT", lambda: float(os.getenv("FEED_TIMEOUT", "15")))
+
+# Wall-clock budget (seconds) for fetching all feeds; 0 = no overall limit
+_lazy("FETCH_TOTAL_TIMEOUT", lambda: float(os.getenv("FETCH_TOTAL_TIMEOUT", "60")))
+
+# Largest feed body (decoded bytes) we will download; bigger responses fail
+_lazy("FEED_MAX_BYTES", lambda: int(os.getenv("FEED_MAX_BYTES", str(10 * 1024 * 1024))))
+
+# Polling daemon (python -m src daemon): bounds (seconds) for each feed's
+# adaptive poll interval
+_lazy("DAEMON_MIN_INTERVAL", lambda: float(os.getenv("DAEMON_MIN_INTERVAL", "120")))
+_lazy("DAEMON_MAX_INTERVAL", lambda: float(os.getenv("DAEMON_MAX_INTERVAL", "3600")))
+
+# Worker processes for parsing downloaded feeds (0 = parse in the fetch threads)
+_lazy("PARSE_PROCESSES", lambda: int(os.getenv("PARSE_PROCESSES", "0")))
+
+# Parse well-formed RSS 2.0 / Atom with the streaming parser in
+# src/fastparse.py, falling back to feedparser for anything else
+_lazy("FAST_PARSE", lambda: _env_flag("FAST_PARSE", default=True))
+
+# Stream articles from feeds straight into filtering as each feed finishes,
+# keeping only the top MAX_ARTICLES in memory instead of the full list
+_lazy("STREAM_PIPELINE", lambda: _env_flag("STREAM_PIPELINE"))
+
+# On-disk cache of ETag / Last-Modified / body hash + parsed articles per feed
+# (set FEED_CACHE_DIR to an empty value to disable)
+_lazy("FEED_CACHE_DIR", lambda: os.getenv("FEED_CACHE_DIR", str(BASE_DIR / ".cache" / "feeds")))
+
+# Feed health registry + circuit breaker (src/health.py): after
+# FEED_FAILURE_THRESHOLD consecutive failures a feed is skipped for
+# FEED_BREAKER_BASE_HOURS, doubling per further failure up to
+# FEED_BREAKER_MAX_HOURS, then probed again. Empty FEED_HEALTH_PATH disables.
+_lazy("FEED_HEALTH_PATH", lambda: os.getenv("FEED_HEALTH_PATH", str(BASE_DIR / ".cache" / "feed_health.json")))
+_lazy("FEED_FAILURE_THRESHOLD", lambda: int(os.getenv("FEED_FAILURE_THRESHOLD", "3")))
+_lazy("FEED_BREAKER_BASE_HOURS", lambda: float(os.getenv("FEED_BREAKER_BASE_HOURS", "24")))
+_lazy("FEED_BREAKER_MAX_HOURS", lambda: float(os.getenv("FEED_BREAKER_MAX_HOURS", "720")))
+
+# Record/replay of raw feed responses (src/snapshots.py):
+# SNAPSHOT_MODE = "record" saves every response, "replay" serves feeds from a
+# saved snapshot with no network access, empty = off. SNAPSHOT_NAME picks the
+# snapshot (default: today's UTC date). The feed cache is bypassed in both modes.
+_lazy("SNAPSHOT_MODE", lambda: os.getenv("SNAPSHOT_MODE", "").strip().lower())
+_lazy("SNAPSHOT_DIR", lambda: os.getenv("SNAPSHOT_DIR", str(BASE_DIR / "snapshots")))
+_lazy("SNAPSHOT_NAME", lambda: os.getenv("SNAPSHOT_NAME", "").strip())
+
+
+# -------------------------------------------------
+# Article store – SQLite file for incremental runs
+# -------------------------------------------------
+
+# When set, every fetched article is upserted here and only articles not yet
+# sent are filtered/rendered; articles are marked sent once their edition's
+# send succeeds. Empty = stateless (every run starts over).
+_lazy("ARTICLE_DB", lambda: os.getenv("ARTICLE_DB", ""))
+
+
+# -------------------------------------------------
+# Near-duplicate clustering (same story, different sources)
+# -------------------------------------------------
+
+# Estimated Jaccard similarity at which two stories count as the same;
+# 0 disables clustering
+_lazy("NEAR_DUPLICATE_THRESHOLD", lambda: float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.5")))
+
+# With ARTICLE_DB set, also collapse today's stories into ones sent in the
+# last N days
+_lazy("DEDUPE_HISTORY_DAYS", lambda: int(os.getenv("DEDUPE_HISTORY_DAYS", "3")))
 
 
 # -------------------------------------------------
 # MACRO KEYWORDS – tight & focused
 # -------------------------------------------------
 
-DEFAULT_MACRO_KEYWORDS = [
+DEFAULT_KEYWORD_GROUPS = {
     # Monetary policy & central banks
-    "rate hike",
-    "rate cut",
-    "interest rate",
-    "benchmark rate",
-    "policy rate",
-    "fomc",
-    "federal reserve",
-    "fed",
-    "ecb",
-    "european central bank",
-    "bank of england",
-    "boe",
-    "boj",
-    "bank of japan",
-    "central bank",
-    "policy meeting",
-    "monetary policy",
-    "tightening",
-    "easing",
-    "quantitative easing",
-    "quantitative tightening",
-    "qe",
-    "qt",
-
+    "monetary": [
+        "rate hike",
+        "rate cut",
+        "interest rate",
+        "benchmark rate",
+        "policy rate",
+        "fomc",
+        "federal reserve",
+        "fed",
+        "ecb",
+        "european central bank",
+        "bank of england",
+        "boe",
+        "boj",
+        "bank of japan",
+        "central bank",
+        "policy meeting",
+        "monetary policy",
+        "tightening",
+        "easing",
+        "quantitative easing",
+        "quantitative tightening",
+        "qe",
+        "qt",
+    ],
     # Inflation & prices
-    "inflation",
-    "cpi",
-    "ppi",
-    "core inflation",
-    "headline inflation",
-    "disinflation",
-    "deflation",
-
+    "inflation": [
+        "inflation",
+        "cpi",
+        "ppi",
+        "core inflation",
+        "headline inflation",
+        "disinflation",
+        "deflation",
+    ],
     # GDP, growth, recession
-    "gdp",
-    "economic growth",
-    "recession",
-    "soft landing",
-    "hard landing",
-    "contraction",
-    "expansion",
-
+    "growth": [
+        "gdp",
+        "economic growth",
+        "recession",
+        "soft landing",
+        "hard landing",
+        "contraction",
+        "expansion",
+    ],
     # Labour market
-    "unemployment",
-    "jobless claims",
-    "labor market",
-    "labour market",
-    "wage growth",
-    "employment",
-
+    "labour": [
+        "unemployment",
+        "jobless claims",
+        "labor market",
+        "labour market",
+        "wage growth",
+        "employment",
+    ],
     # Yields, bonds, and rates markets
-    "yield",
-    "bond market",
-    "treasury",
-    "treasuries",
-    "gilt",
-    "bund",
-    "sofr",
-
+    "rates": [
+        "yield",
+        "bond market",
+        "treasury",
+        "treasuries",
+        "gilt",
+        "bund",
+        "sofr",
+    ],
     # Fiscal policy
-    "fiscal",
-    "budget deficit",
-    "government spending",
-    "public debt",
-    "sovereign debt",
-
+    "fiscal": [
+        "fiscal",
+        "budget deficit",
+        "government spending",
+        "public debt",
+        "sovereign debt",
+    ],
     # Global institutions
-    "imf",
-    "world bank",
-    "oecd",
-
+    "institutions": [
+        "imf",
+        "world bank",
+        "oecd",
+    ],
     # Macro / systemic risk
-    "currency crisis",
-    "financial stability",
-    "systemic risk",
-]
+    "risk": [
+        "currency crisis",
+        "financial stability",
+        "systemic risk",
+    ],
+}
+
+DEFAULT_MACRO_KEYWORDS = [kw for group in DEFAULT_KEYWORD_GROUPS.values() for kw in group]
 
-MACRO_KEYWORDS = _split_csv(os.getenv("MACRO_KEYWORDS", "")) or DEFAULT_MACRO_KEYWORDS
+_lazy(
+    "MACRO_KEYWORDS",
+    lambda: _split_csv(os.getenv("MACRO_KEYWORDS", "")) or DEFAULT_MACRO_KEYWORDS,
+)
 
 
 # -------------------------------------------------
 # Newsletter subject
 # -------------------------------------------------
 
-NEWSLETTER_SUBJECT = os.getenv("NEWSLETTER_SUBJECT", "Daily Macro Brief")
+_lazy("NEWSLETTER_SUBJECT", lambda: os.getenv("NEWSLETTER_SUBJECT", "Daily Macro Brief"))
+
+
+# -------------------------------------------------
+# Static archive of past issues (GitHub Pages)
+# -------------------------------------------------
+
+# Directory for per-issue pages, index pages and the search index. On by
+# default (the Pages workflow publishes it); empty disables
+_lazy("ARCHIVE_DIR", lambda: os.getenv("ARCHIVE_DIR", str(BASE_DIR / "archive")))
+
+# Public URL of the GitHub Pages site, used for links in feed.json / feed.xml
+_lazy("SITE_URL", lambda: os.getenv("SITE_URL", "https://parthm14.github.io/macro-newsletter-/"))
+
+
+# -------------------------------------------------
+# Output size (see src/optimize.py)
+# -------------------------------------------------
+
+# Byte budget for the email HTML; the lowest-ranked articles are dropped to
+# fit (Gmail clips messages past ~102KB). 0 = no limit
+_lazy("EMAIL_BYTE_BUDGET", lambda: int(os.getenv("EMAIL_BYTE_BUDGET", "100000")))
+
+# Write .gz (and .br, with brotli installed) copies next to the web pages
+_lazy("PRECOMPRESS_PAGES", lambda: _env_flag("PRECOMPRESS_PAGES", default=True))
+
+# Filter / render outputs keyed by a hash of their inputs (see
+# src/artifacts.py), reused by later runs. On by default; empty disables
+_lazy("ARTIFACT_DIR", lambda: os.getenv("ARTIFACT_DIR", str(BASE_DIR / ".cache" / "artifacts")))
 
 
 # -------------------------------------------------
 # Max number of articles in the newsletter
 # -------------------------------------------------
 
-MAX_ARTICLES = int(os.getenv("MAX_ARTICLES", "20"))
\ No newline at end of file
+_lazy("MAX_ARTICLES", lambda: int(os.getenv("MAX_ARTICLES", "20")))
+
+# Several editions from one fetch (see src/editions.py): JSON file of
+# per-edition keywords / cap / recipients / subject; empty = single brief
+# from MACRO_KEYWORDS / MAX_ARTICLES / TO_EMAILS
+_lazy("EDITIONS_FILE", lambda: os.getenv("EDITIONS_FILE", ""))
+
+# Only articles published within this window make the brief: a duration such
+# as "36h", "90m" or "2d", "last-issue" for everything since the previous
+# issue went out (recorded in LAST_ISSUE_PATH), or empty for no limit
+_lazy("TIME_WINDOW", lambda: os.getenv("TIME_WINDOW", ""))
+_lazy("LAST_ISSUE_PATH", lambda: os.getenv("LAST_ISSUE_PATH", str(BASE_DIR / ".cache" / "last_issue.txt")))
+
+
+# -------------------------------------------------
+# Ranking of the articles that made the cut
+# -------------------------------------------------
+
+# "recency" = newest first (the original behaviour), "bm25" = keyword
+# relevance with recency decay
+_lazy("RANKING", lambda: os.getenv("RANKING", "recency").strip().lower())
+
+# Optional weights per keyword or per keyword group name from
+# DEFAULT_KEYWORD_GROUPS, e.g. "fomc:3,rate cut:2,monetary:1.5"
+_lazy("KEYWORD_WEIGHTS", lambda: os.getenv("KEYWORD_WEIGHTS", ""))
+
+# Score halves for every this many hours of age (0 = no recency decay)
+_lazy("RECENCY_HALF_LIFE_HOURS", lambda: float(os.getenv("RECENCY_HALF_LIFE_HOURS", "24")))
+
+
+# -------------------------------------------------
+# Run instrumentation (main.run)
+# -------------------------------------------------
+
+# Machine-readable JSON report of per-feed and per-stage timings/memory
+_lazy("RUN_REPORT_PATH", lambda: os.getenv("RUN_REPORT_PATH", ""))
+
+# Optional node_exporter textfile (e.g. /var/lib/node_exporter/macro_newsletter.prom)
+_lazy("PROMETHEUS_TEXTFILE", lambda: os.getenv("PROMETHEUS_TEXTFILE", ""))
+
+# When set, a cProfile .pstats dump is written here for each stage (main
+# thread only: the fetch stage's worker threads are not profiled)
+_lazy("PROFILE_DIR", lambda: os.getenv("PROFILE_DIR", ""))
+
+# Track peak memory per stage with tracemalloc. Off by default: tracing
+# every allocation slows the run down considerably
+_lazy("TRACE_MEMORY", lambda: _env_flag("TRACE_MEMORY", default=False))
@@ -0,0 +1,293 @@
+# src/daemon.py
+"""
+Long-running polling mode: `python -m src daemon` (or `python -m src.daemon`).
+
+Instead of one cold run a day, each feed is polled on its own schedule:
+
+- The interval adapts to how often the feed actually publishes. A poll that
+  finds new entries halves it; a poll that finds nothing stretches it by half.
+  The first poll seeds it from the gaps between the feed's entry timestamps.
+- Publisher hints are minimums: the feed's <ttl>, Cache-Control max-age and
+  Retry-After (on 429/503) all push the next poll out.
+- Errors back off exponentially up to DAEMON_MAX_INTERVAL.
+
+Parsed articles stay in memory between polls (polls are conditional GETs via
+the feed cache) in a TimeIndex, so stories that scroll off a busy feed stay
+in the brief for as long as they are inside TIME_WINDOW. The brief is
+re-rendered whenever a poll brings in a new article that matches the macro
+keywords.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set
+import heapq
+import logging
+import re
+import threading
+import time
+
+from . import config
+from .matcher import get_matcher
+from .scraper import Article, FeedPoll, poll_feed
+from .timeindex import TimeIndex, window_start
+
+_MAX_AGE = re.compile(r"(?:^|[,\s])max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+def _max_age(headers: Mapping[str, str]) -> Optional[float]:
+    match = _MAX_AGE.search(headers.get("cache-control", ""))
+    return float(match.group(1)) if match else None
+
+
+def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header, either delta-seconds or an
+    HTTP date.
+    """
+    value = (headers or {}).get("retry-after") or (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _publish_interval(articles: Sequence[Article]) -> Optional[float]:
+    """
+    Median gap in seconds between consecutive entry timestamps, or None if
+    the feed has fewer than two dated entries.
+    """
+    stamps = sorted(a.published.timestamp() for a in articles if a.published)
+    gaps = sorted(b - a for a, b in zip(stamps, stamps[1:]) if b > a)
+    if not gaps:
+        return None
+    return gaps[len(gaps) // 2]
+
+
+@dataclass
+class FeedState:
+    url: str
+    interval: float
+    next_poll: float = 0.0
+    articles: List[Article] = field(default_factory=list)
+    # Keys of the entries in the last successful poll; None before the first
+    seen: Optional[Set[str]] = None
+    failures: int = 0
+
+    def __lt__(self, other: "FeedState") -> bool:
+        return self.next_poll < other.next_poll
+
+
+def _article_key(article: Article) -> str:
+    return article.link or f"{article.source}\n{article.title}"
+
+
+class PollingDaemon:
+    def __init__(
+        self,
+        feed_urls: Sequence[str],
+        html_paths: Sequence[Path],
+        text_path: Optional[Path] = None,
+        page_paths: Sequence[Path] = (),
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.min_interval = config.DAEMON_MIN_INTERVAL if min_interval is None else min_interval
+        self.max_interval = config.DAEMON_MAX_INTERVAL if max_interval is None else max_interval
+        self.max_workers = config.FETCH_WORKERS if max_workers is None else max_workers
+        # Email bodies (what `send` sends) and web view pages (index.html)
+        self.html_paths = list(html_paths)
+        self.text_path = text_path
+        self.page_paths = list(page_paths)
+        self.feeds: Dict[str, FeedState] = {
+            url: FeedState(url=url, interval=self.min_interval) for url in feed_urls
+        }
+        self.index = TimeIndex()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _schedule(self, state: FeedState, poll: FeedPoll, new: Optional[int]) -> None:
+        """
+        Pick the next poll time from the observed publish rate and the
+        server's hints. `new` is None on the first successful poll.
+        """
+        if new is None:
+            gap = _publish_interval(poll.articles)
+            if gap is not None:
+                # Poll about twice per typical gap between entries
+                state.interval = self._clamp(gap / 2)
+        elif new:
+            state.interval = self._clamp(state.interval / 2)
+        else:
+            state.interval = self._clamp(state.interval * 1.5)
+
+        delay = state.interval
+        hints = [
+            poll.ttl * 60.0 if poll.ttl else None,
+            _max_age(poll.headers),
+            _retry_after(poll.headers),
+        ]
+        for hint in hints:
+            if hint is not None:
+                delay = max(delay, min(hint, self.max_interval))
+        state.next_poll = time.monotonic() + delay
+        logging.info(
+            "Feed %s: %d new, next poll in %.0fs (interval %.0fs)",
+            state.url,
+            new or 0,
+            delay,
+            state.interval,
+        )
+
+    def _poll(self, state: FeedState) -> List[Article]:
+        """
+        Poll one feed and reschedule it. Returns the entries not seen in its
+        previous poll (all of them on the first poll).
+        """
+        try:
+            poll = poll_feed(state.url)
+        except Exception as exc:
+            state.failures += 1
+            delay = self._clamp(state.interval * (2 ** state.failures))
+            hint = _retry_after(getattr(exc, "headers", None))
+            if hint is not None:
+                delay = max(delay, min(hint, self.max_interval))
+            state.next_poll = time.monotonic() + delay
+            logging.warning(
+                "Polling %s failed (%s); retrying in %.0fs", state.url, exc, delay
+            )
+            return []
+
+        state.failures = 0
+        previous = state.seen
+        state.articles = poll.articles
+        # Only the current entries are kept, so memory stays bounded by feed size
+        state.seen = {_article_key(a) for a in poll.articles}
+        if previous is None:
+            self._schedule(state, poll, None)
+            return list(poll.articles)
+        fresh = [a for a in poll.articles if _article_key(a) not in previous]
+        self._schedule(state, poll, len(fresh))
+        return fresh
+
+    def rebuild(self) -> None:
+        """
+        Re-select and re-render the brief from the articles collected so far.
+        Articles older than TIME_WINDOW (or DEDUPE_HISTORY_DAYS when there is
+        no window) are dropped from memory first. The email goes to
+        html_paths / text_path and the web view, with its .gz/.br copies, to
+        page_paths, as in the page build.
+        """
+        from .artifacts import copy_if_changed
+        from .filter import select_articles
+        from .formats import render_formats
+        from .optimize import precompress
+
+        since = window_start(config.TIME_WINDOW, last_issue_path=config.LAST_ISSUE_PATH)
+        cutoff = since or datetime.now(timezone.utc) - timedelta(days=config.DEDUPE_HISTORY_DAYS)
+        self.index.drop_before(cutoff)
+        articles = self.index.window(since)
+        if since is None:
+            # Undated entries can't be indexed; without a window they still count
+            articles += [
+                a for state in self.feeds.values() for a in state.articles if a.published is None
+            ]
+        # Work on fresh copies: filtering fills in keywords/related sources
+        selected = select_articles(
+            [replace(a, keywords=[], keyword_counts={}, related_sources=[]) for a in articles]
+        )
+
+        today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        subject = f"{config.NEWSLETTER_SUBJECT} — {today_str}"
+        # One pass streams the first path of each kind; the rest are copies
+        first_html, *more_html = self.html_paths or [None]
+        first_page, *more_pages = self.page_paths or [None]
+        render_formats(subject, selected, html=first_html, text=self.text_path, web=first_page)
+        for path in more_html:
+            copy_if_changed(first_html, path)
+        for path in more_pages:
+            copy_if_changed(first_page, path)
+        for path in self.page_paths:
+            precompress(path)
+        logging.info(
+            "Rebuilt brief with %d articles from %d in memory", len(selected), len(articles)
+        )
+
+    def run(self, max_rounds: Optional[int] = None) -> None:
+        """
+        Poll until stop() is called (or for `max_rounds` scheduling rounds).
+        Each round polls every due feed concurrently, then sleeps until the
+        next feed is due.
+        """
+        queue = list(self.feeds.values())
+        heapq.heapify(queue)
+        rounds = 0
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_workers, len(queue))),
+            thread_name_prefix="poll",
+        ) as executor:
+            while queue and not self._stop.is_set():
+                now = time.monotonic()
+                due = []
+                while queue and queue[0].next_poll <= now:
+                    due.append(heapq.heappop(queue))
+
+                if due:
+                    fresh = [a for articles in executor.map(self._poll, due) for a in articles]
+                    for state in due:
+                        heapq.heappush(queue, state)
+                    for article in fresh:
+                        self.index.add(article)
+                    matcher = get_matcher(config.MACRO_KEYWORDS)
+                    relevant = any(matcher.search(f"{a.title}\n{a.text}") for a in fresh)
+                    if relevant or rounds == 0:
+                        self.rebuild()
+                    rounds += 1
+                    if max_rounds is not None and rounds >= max_rounds:
+                        break
+                    continue
+
+                self._stop.wait(queue[0].next_poll - now)
+
+
+def run_daemon(
+    html_paths: Sequence[Path],
+    text_path: Optional[Path] = None,
+    page_paths: Sequence[Path] = (),
+) -> None:
+    daemon = PollingDaemon(config.FEED_URLS, html_paths, text_path, page_paths)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        logging.info("Daemon stopped")
+
+
+if __name__ == "__main__":
+    # Run `python -m src.daemon` from project root; Ctrl-C to stop
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stdout,
+    )
+    run_daemon([config.BASE_DIR / "preview.html"], page_paths=[config.BASE_DIR / "index.html"])
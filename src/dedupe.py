@@ -0,0 +1,126 @@
+# src/dedupe.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import random
+import re
+
+from .scraper import Article
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# How much of the summary goes into the fingerprint; headline + lede is what
+# syndicated copies share, the tail is where outlets diverge
+_SUMMARY_WORDS = 40
+
+
+def _shingles(article: Article) -> set:
+    """
+    Word bigrams of the title plus the start of the summary.
+    """
+    words = _TOKEN.findall(article.title.lower())
+    words += _TOKEN.findall(article.text.lower())[:_SUMMARY_WORDS]
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _hash_shingle(shingle: str) -> int:
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little")
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index for spotting the same story syndicated across sources
+    under slightly different headlines.
+
+    Each article gets a MinHash signature of `bands * rows` values; an article
+    is only compared against earlier ones sharing at least one band bucket, so
+    lookups stay roughly constant-time as the index grows. Candidates whose
+    estimated Jaccard similarity reaches `threshold` join that cluster.
+    """
+
+    def __init__(self, threshold: float = 0.5, bands: int = 16, rows: int = 4, seed: int = 1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        num_perm = bands * rows
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[Tuple[int, ...]] = []
+        self._representatives: List[Article] = []
+
+    def __len__(self) -> int:
+        return len(self._representatives)
+
+    def signature(self, article: Article) -> Optional[Tuple[int, ...]]:
+        hashes = [_hash_shingle(s) for s in _shingles(article)]
+        if not hashes:
+            return None
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        r = self.rows
+        return [signature[i * r:(i + 1) * r] for i in range(self.bands)]
+
+    def _similarity(self, sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+    def add(self, article: Article) -> Optional[Article]:
+        """
+        Index `article`. If it is a near-duplicate of an article already in the
+        index, it is not added; its source is recorded on that cluster's
+        representative, which is returned. Otherwise returns None.
+        """
+        signature = self.signature(article)
+        if signature is None:
+            return None
+
+        band_keys = self._band_keys(signature)
+        best_id, best_score = None, 0.0
+        checked = set()
+        for band, key in enumerate(band_keys):
+            for cluster_id in self._buckets[band].get(key, ()):
+                if cluster_id in checked:
+                    continue
+                checked.add(cluster_id)
+                score = self._similarity(signature, self._signatures[cluster_id])
+                if score > best_score:
+                    best_id, best_score = cluster_id, score
+
+        if best_id is not None and best_score >= self.threshold:
+            representative = self._representatives[best_id]
+            if (
+                article.source != representative.source
+                and article.source not in representative.related_sources
+            ):
+                representative.related_sources.append(article.source)
+            return representative
+
+        cluster_id = len(self._representatives)
+        self._signatures.append(signature)
+        self._representatives.append(article)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(cluster_id)
+        return None
+
+    def seed(self, articles: Iterable[Article]) -> int:
+        """
+        Preload previously published articles (e.g. the last few days from the
+        ArticleStore) so today's syndicated copies of them are recognised.
+        Returns how many clusters the index now holds.
+        """
+        for article in articles:
+            self.add(article)
+        return len(self)
@@ -0,0 +1,119 @@
+# src/editions.py
+"""
+Editions: several briefs (e.g. rates, FX, EM, general) built from one fetch.
+
+Each edition has its own keywords, cap, recipients and subject. They are read
+from the JSON file named by EDITIONS_FILE:
+
+    {
+      "editions": [
+        {"name": "general"},
+        {
+          "name": "rates",
+          "subject": "Rates Brief",
+          "groups": ["monetary", "rates"],
+          "keywords": ["term premium"],
+          "max_articles": 12,
+          "recipients": ["rates-desk@example.com"]
+        }
+      ]
+    }
+
+"groups" pulls in DEFAULT_KEYWORD_GROUPS from src/config.py and "keywords"
+adds to them; an edition with neither uses MACRO_KEYWORDS. Missing
+max_articles / recipients / subject fall back to MAX_ARTICLES / TO_EMAILS /
+NEWSLETTER_SUBJECT. Without EDITIONS_FILE there is a single edition built
+from those settings, i.e. the classic brief.
+
+See filter.select_editions for how all editions are matched in one pass.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+import json
+import re
+
+from . import config
+from .matcher import normalize_keyword
+
+_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+@dataclass
+class Edition:
+    name: str
+    keywords: List[str]
+    max_articles: int
+    recipients: List[str] = field(default_factory=list)
+    subject: str = ""
+
+
+def default_edition() -> Edition:
+    return Edition(
+        name="brief",
+        keywords=list(config.MACRO_KEYWORDS),
+        max_articles=config.MAX_ARTICLES,
+        recipients=list(config.TO_EMAILS),
+        subject=config.NEWSLETTER_SUBJECT,
+    )
+
+
+def _edition_from_dict(data: Mapping[str, Any]) -> Edition:
+    name = str(data.get("name", "")).strip().lower()
+    if not _NAME.match(name):
+        raise ValueError(f"Edition name {name!r} must be lower-case letters, digits, '-' or '_'")
+
+    keywords: List[str] = []
+    for group in data.get("groups", []):
+        if group not in config.DEFAULT_KEYWORD_GROUPS:
+            raise ValueError(f"Edition {name!r}: unknown keyword group {group!r}")
+        keywords.extend(config.DEFAULT_KEYWORD_GROUPS[group])
+    keywords.extend(data.get("keywords", []))
+    if not keywords:
+        keywords = list(config.MACRO_KEYWORDS)
+
+    return Edition(
+        name=name,
+        keywords=keywords,
+        max_articles=int(data.get("max_articles") or config.MAX_ARTICLES),
+        recipients=list(data.get("recipients") or config.TO_EMAILS),
+        subject=data.get("subject") or config.NEWSLETTER_SUBJECT,
+    )
+
+
+def load_editions(path: str | Path | None = None) -> List[Edition]:
+    """
+    The editions in `path` (default: EDITIONS_FILE), or the single default
+    edition when no file is configured.
+    """
+    path = path or config.EDITIONS_FILE
+    if not path:
+        return [default_edition()]
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    editions = [_edition_from_dict(d) for d in data.get("editions", [])]
+    if not editions:
+        raise ValueError(f"{path} defines no editions")
+
+    names = [e.name for e in editions]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"{path}: duplicate edition names {sorted(duplicates)}")
+    return editions
+
+
+def keyword_masks(editions: Sequence[Edition]) -> Dict[str, int]:
+    """
+    Map each normalized keyword to a bitmask of the editions that use it
+    (bit i = editions[i]).
+    """
+    masks: Dict[str, int] = {}
+    for i, edition in enumerate(editions):
+        for keyword in edition.keywords:
+            keyword = normalize_keyword(keyword)
+            if keyword:
+                masks[keyword] = masks.get(keyword, 0) | (1 << i)
+    return masks
@@ -1,100 +1,27 @@
 # src/email_builder.py
 from __future__ import annotations
 
-from typing import Iterable
+from collections import OrderedDict
+from typing import Iterable, Tuple
 from datetime import datetime
+from html import escape
+from string import Template
+import hashlib
 
 from .scraper import Article
+from .text import truncate_words
 
+# Bump whenever the templates below change, so cached fragments and any
+# downstream artifacts keyed on rendered output are invalidated
+TEMPLATE_VERSION = "4"
 
-def _format_timestamp(dt: datetime | None) -> str:
-    if not dt:
-        return ""
-    return dt.strftime("%Y-%m-%d %H:%M")
-
-
-def build_html_email(
-    subject: str,
-    articles: Iterable[Article],
-) -> str:
-    """
-    Build a nicer-looking HTML email / web page containing the given articles.
-    This HTML is also what we'll serve as index.html for GitHub Pages.
-    """
-    articles_list = list(articles)
-
-    if not articles_list:
-        articles_html = """
-        <tr>
-          <td style="padding: 24px; text-align: center; color: #6b7280; font-size: 14px;">
-            No macro-relevant stories found today.
-          </td>
-        </tr>
-        """
-    else:
-        rows = []
-        for a in articles_list:
-            ts = _format_timestamp(a.published)
-            ts_text = f"{ts}" if ts else ""
-            source_text = a.source or "Unknown source"
-
-            summary_text = a.summary.strip()
-            if len(summary_text) > 280:
-                summary_text = summary_text[:280].rstrip() + "..."
-
-            rows.append(
-                f"""
-                <tr>
-                  <td style="
-                    padding: 16px 18px;
-                    border-radius: 12px;
-                    border: 1px solid #e5e7eb;
-                    background-color: #ffffff;
-                    box-shadow: 0 4px 10px rgba(15, 23, 42, 0.08);
-                    margin-bottom: 12px;
-                  ">
-                    <a href="{a.link}" style="
-                      font-size: 16px;
-                      font-weight: 600;
-                      color: #0f172a;
-                      text-decoration: none;
-                      line-height: 1.4;
-                    ">
-                      {a.title}
-                    </a>
-                    <div style="margin-top: 6px; margin-bottom: 8px; font-size: 12px; color: #6b7280; display: flex; flex-wrap: wrap; gap: 8px; align-items: center;">
-                      <span style="
-                        display: inline-block;
-                        padding: 2px 8px;
-                        border-radius: 999px;
-                        background-color: #eff6ff;
-                        color: #1d4ed8;
-                        font-weight: 500;
-                      ">
-                        {source_text}
-                      </span>
-                      {f'<span style="color:#9ca3af;">• {ts_text}</span>' if ts_text else ''}
-                    </div>
-                    <div style="font-size: 13px; color: #374151; line-height: 1.5;">
-                      {summary_text}
-                    </div>
-                  </td>
-                </tr>
-                <tr><td style="height: 10px;"></td></tr>
-                """
-            )
-
-        articles_html = "\n".join(rows)
-
-    display_title = "Daily Macro Brief"
-    display_subtitle = "Curated macro & markets headlines from major global sources."
-
-    html = f"""\
+# Templates are parsed once at import; values are substituted already escaped
+_PAGE_TEMPLATE = Template("""\
 <!DOCTYPE html>
 <html>
 <head>
   <meta charset="UTF-8" />
-  <title>{subject}</title>
+  <title>$subject</title>
   <meta name="viewport" content="width=device-width, initial-scale=1.0" />
 </head>
 <body style="
@@ -137,7 +64,7 @@ def build_html_email(
                         justify-content:center;
                         box-shadow:0 2px 6px rgba(15,23,42,0.35);
                       ">
-                        <img src="ismf-logo.png" alt="ISMF logo" style="
+                        <img src="${asset_base}ismf-logo.png" alt="ISMF logo" style="
                           max-width:36px;
                           max-height:36px;
                           display:block;
@@ -152,10 +79,10 @@ def build_html_email(
                       Macro Newsletter · Beta
                     </div>
                     <h1 style="margin: 0 0 6px; font-size: 24px; line-height: 1.25; color:#e5e7eb;">
-                      {display_title}
+                      $display_title
                     </h1>
                     <p style="margin: 0; font-size: 13px; color:#9ca3af;">
-                      {display_subtitle}
+                      $display_subtitle
                     </p>
                   </td>
                   <td style="text-align:right; vertical-align:top;">
@@ -168,7 +95,7 @@ def build_html_email(
                       font-size:11px;
                       border:1px solid rgba(148,163,184,0.35);
                     ">
-                      {subject}
+                      $subject
                     </div>
                   </td>
                 </tr>
@@ -179,7 +106,7 @@ def build_html_email(
 
               <!-- Content area -->
               <table width="100%" cellpadding="0" cellspacing="0" border="0" style="border-collapse: separate; border-spacing: 0;">
-                {articles_html}
+                $articles_html
               </table>
 
               <!-- Footer -->
@@ -199,50 +126,194 @@ def build_html_email(
   </table>
 </body>
 </html>
-"""
-    return html
+""")
 
+_EMPTY_HTML = """
+        <tr>
+          <td style="padding: 24px; text-align: center; color: #6b7280; font-size: 14px;">
+            No macro-relevant stories found today.
+          </td>
+        </tr>
+        """
 
-def build_text_email(
+_EMPTY_TEXT = "\nNo macro-relevant stories found today."
+
+_CARD_TEMPLATE = Template("""
+                <tr>
+                  <td style="
+                    padding: 16px 18px;
+                    border-radius: 12px;
+                    border: 1px solid #e5e7eb;
+                    background-color: #ffffff;
+                    box-shadow: 0 4px 10px rgba(15, 23, 42, 0.08);
+                    margin-bottom: 12px;
+                  ">
+                    <a href="$link" style="
+                      font-size: 16px;
+                      font-weight: 600;
+                      color: #0f172a;
+                      text-decoration: none;
+                      line-height: 1.4;
+                    ">
+                      $title
+                    </a>
+                    <div style="margin-top: 6px; margin-bottom: 8px; font-size: 12px; color: #6b7280; display: flex; flex-wrap: wrap; gap: 8px; align-items: center;">
+                      <span style="
+                        display: inline-block;
+                        padding: 2px 8px;
+                        border-radius: 999px;
+                        background-color: #eff6ff;
+                        color: #1d4ed8;
+                        font-weight: 500;
+                      ">
+                        $source
+                      </span>
+                      $timestamp
+                      $also
+                    </div>
+                    <div style="font-size: 13px; color: #374151; line-height: 1.5;">
+                      $summary
+                    </div>
+                  </td>
+                </tr>
+                <tr><td style="height: 10px;"></td></tr>
+""")
+
+# Rendered (html, text) fragments keyed by a hash of the article content, so
+# re-rendering a page after a few new stories only renders the new cards
+_FRAGMENT_CACHE_SIZE = 2048
+_fragment_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
+
+def _format_timestamp(dt: datetime | None) -> str:
+    if not dt:
+        return ""
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
+def _fragment_key(article: Article) -> str:
+    parts = [
+        TEMPLATE_VERSION,
+        article.title,
+        article.link,
+        article.source,
+        article.published.isoformat() if article.published else "",
+        article.text,
+        *article.related_sources,
+    ]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _render_fragments(article: Article) -> Tuple[str, str]:
+    """
+    Render one article as an HTML card and a plain-text block (without the
+    list number), reusing the cached copy when the article hasn't changed.
+    """
+    key = _fragment_key(article)
+    cached = _fragment_cache.get(key)
+    if cached is not None:
+        _fragment_cache.move_to_end(key)
+        return cached
+
+    ts = _format_timestamp(article.published)
+    source_text = article.source or "Unknown source"
+    also_text = ", ".join(article.related_sources)
+
+    summary_text = truncate_words(article.text, 280)
+
+    html_fragment = _CARD_TEMPLATE.substitute(
+        link=escape(article.link),
+        title=escape(article.title),
+        source=escape(source_text),
+        timestamp=f'<span style="color:#9ca3af;">• {escape(ts)}</span>' if ts else "",
+        also=f'<span style="color:#9ca3af;">Also: {escape(also_text)}</span>' if also_text else "",
+        summary=escape(summary_text),
+    )
+
+    lines = [article.title]
+    if ts:
+        lines.append(f"   ({article.source}, {ts})")
+    else:
+        lines.append(f"   ({article.source})")
+    if also_text:
+        lines.append(f"   Also: {also_text}")
+    lines.append(f"   {article.link}")
+    if article.text:
+        lines.append(f"   {truncate_words(article.text, 200)}")
+    text_fragment = "\n".join(lines)
+
+    _fragment_cache[key] = (html_fragment, text_fragment)
+    if len(_fragment_cache) > _FRAGMENT_CACHE_SIZE:
+        _fragment_cache.popitem(last=False)
+    return html_fragment, text_fragment
+
+
+def _page_parts(subject: str, asset_base: str = "") -> Tuple[str, str]:
+    """
+    The page before and after the article cards, for renderers that stream
+    the cards in between (see src/formats.py). `asset_base` prefixes the
+    URLs of the page's own assets (the logo), e.g. "../" for a page one
+    directory below the site root.
+    """
+    page = _PAGE_TEMPLATE.substitute(
+        subject=escape(subject),
+        asset_base=escape(asset_base),
+        display_title=escape("Daily Macro Brief"),
+        display_subtitle=escape("Curated macro & markets headlines from major global sources."),
+        articles_html="\0",
+    )
+    head, tail = page.split("\0")
+    return head, tail
+
+
+def _text_head(subject: str) -> str:
+    # The plain-text counterpart of _page_parts: the text before the items
+    return f"{subject}\n\nDaily Macro Brief\n==================\n"
+
+
+def _text_item(number: int, fragment: str) -> str:
+    return f"\n{number}. {fragment}\n"
+
+
+def build_html_email(
     subject: str,
     articles: Iterable[Article],
+    asset_base: str = "",
 ) -> str:
     """
-    Build a plain-text version of the email (for clients that don't render HTML).
+    Build a nicer-looking HTML email / web page containing the given articles.
+    This HTML is also what we'll serve as index.html for GitHub Pages.
     """
-    articles_list = list(articles)
+    rows = [_render_fragments(a)[0] for a in articles]
+    articles_html = "\n".join(rows) if rows else _EMPTY_HTML
 
-    lines = [subject, "", "Daily Macro Brief", "==================", ""]
+    head, tail = _page_parts(subject, asset_base)
+    return head + articles_html + tail
 
-    if not articles_list:
-        lines.append("No macro-relevant stories found today.")
-    else:
-        for i, a in enumerate(articles_list, start=1):
-            ts = _format_timestamp(a.published)
-            lines.append(f"{i}. {a.title}")
-            if ts:
-                lines.append(f"   ({a.source}, {ts})")
-            else:
-                lines.append(f"   ({a.source})")
-            lines.append(f"   {a.link}")
-            if a.summary:
-                lines.append(
-                    f"   {a.summary[:200]}{'...' if len(a.summary) > 200 else ''}"
-                )
-            lines.append("")
-
-    return "\n".join(lines)
+
+def build_text_email(
+    subject: str,
+    articles: Iterable[Article],
+) -> str:
+    """
+    Build a plain-text version of the email (for clients that don't render HTML).
+    """
+    items = [_text_item(i, _render_fragments(a)[1]) for i, a in enumerate(articles, start=1)]
+    return _text_head(subject) + ("".join(items) if items else _EMPTY_TEXT)
 
 
 if __name__ == "__main__":
-    # Local preview: run `python -m src.email_builder` from project root
+    # Local preview: run `python -m src.email_builder`; every output is
+    # written under the project root (BASE_DIR), whatever the working directory
     import logging
     import sys
     from datetime import datetime, timezone
 
-    from .config import FEED_URLS, MACRO_KEYWORDS, NEWSLETTER_SUBJECT, MAX_ARTICLES
-    from .scraper import fetch_all_feeds
-    from .filter import filter_articles
+    from .config import BASE_DIR, FEED_URLS, STREAM_PIPELINE
+    from .scraper import fetch_all_feeds, iter_all_feeds
+    from .artifacts import cached_render, cached_selections, copy_if_changed
+    from .editions import load_editions
+    from .optimize import precompress
 
     logging.basicConfig(
         level=logging.INFO,
@@ -251,34 +322,69 @@ if __name__ == "__main__":
     )
 
     logging.info("Fetching feeds for email preview...")
-    all_articles = fetch_all_feeds( FEED_URLS )
-    logging.info("Fetched %d total articles", len(all_articles))
-
-    filtered = filter_articles(all_articles, MACRO_KEYWORDS, max_articles=MAX_ARTICLES)
+    if STREAM_PIPELINE:
+        all_articles = iter_all_feeds(FEED_URLS)
+    else:
+        all_articles = fetch_all_feeds( FEED_URLS )
+        logging.info("Fetched %d total articles", len(all_articles))
+
+    # The first edition is the site's front page; with EDITIONS_FILE every
+    # edition also gets editions/<name>.html
+    editions = load_editions()
+    selections = cached_selections(all_articles, editions)
+    filtered = selections[0]
     logging.info(
         "After filtering and capping, %d articles remain (max %d)",
         len(filtered),
-        MAX_ARTICLES,
+        editions[0].max_articles,
     )
 
     today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    subject = f"{NEWSLETTER_SUBJECT} — {today_str}"
+    subject = f"{editions[0].subject} — {today_str}"
 
-    html_body = build_html_email(subject, filtered)
-    text_body = build_text_email(subject, filtered)
+    # preview.html is exactly what recipients get; index.html is the web
+    # view. One rendering pass gives these, the feeds and the send's bodies
+    rendered = cached_render(subject, filtered)
 
     # Write preview for local viewing
-    preview_path = "preview.html"
-    with open(preview_path, "w", encoding="utf-8") as f:
-        f.write(html_body)
+    preview_path = BASE_DIR / "preview.html"
+    copy_if_changed(rendered.html, preview_path)
 
     # Write index.html for GitHub Pages (served at /)
-    index_path = "index.html"
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(html_body)
+    index_path = BASE_DIR / "index.html"
+    copy_if_changed(rendered.web, index_path)
+    precompress(index_path)
 
     logging.info("Wrote HTML preview to %s and %s", preview_path, index_path)
 
+    from .formats import JSON_FEED_NAME, RSS_NAME
+
+    # Structured copies of the brief for the Slack bot / dashboard
+    copy_if_changed(rendered.json_feed, BASE_DIR / JSON_FEED_NAME)
+    if rendered.rss is not None:
+        copy_if_changed(rendered.rss, BASE_DIR / RSS_NAME)
+    else:
+        logging.warning("SITE_URL is empty; not writing %s", RSS_NAME)
+
+    if len(editions) > 1:
+        for edition, selected in zip(editions, selections):
+            edition_path = BASE_DIR / "editions" / f"{edition.name}.html"
+            # One level below the site root, where the logo is
+            edition_brief = cached_render(
+                f"{edition.subject} — {today_str}", selected, asset_base="../"
+            )
+            copy_if_changed(edition_brief.web, edition_path)
+            precompress(edition_path)
+            logging.info("Wrote edition %s to %s", edition.name, edition_path)
+
+    from .config import ARCHIVE_DIR
+
+    if ARCHIVE_DIR:
+        from .archive import archive_issue
+
+        archive_issue(today_str, subject, filtered)
+
     print("\n=== TEXT VERSION (first ~40 lines) ===\n")
-    for line in text_body.splitlines()[:40]:
-        print(line)
\ No newline at end of file
+    with open(rendered.text, "r", encoding="utf-8") as f:
+        for _, line in zip(range(40), f):
+            print(line.rstrip("\n"))
\ No newline at end of file
@@ -0,0 +1,202 @@
+# src/fastparse.py
+"""
+Fast path for parsing well-formed RSS 2.0 and Atom 1.0 feeds.
+
+feedparser builds a full FeedParserDict for every feed (sanitizing and
+normalizing every element) while we only read each entry's title, link,
+summary and date. This parser streams the document with
+xml.etree.ElementTree.iterparse, pulls out just those fields and drops each
+<item>/<entry> once it is read, so memory stays flat on long feeds.
+
+It is deliberately strict: anything it does not handle exactly the way
+feedparser would (malformed XML, a DOCTYPE, RSS 1.0 / Atom 0.3, XHTML
+content, xml:base, an unparseable date, a charset conflict between the
+HTTP header and the XML declaration, ...) raises UnsupportedFeed, and the
+caller falls back to feedparser. Summaries are returned as-is, not
+sanitized; only their plain text (Article.text) is ever rendered.
+
+benchmarks/parity.py checks the results against feedparser.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+from xml.etree.ElementTree import Element, ParseError, iterparse
+import re
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+_ROOT_START = re.compile(rb"<[A-Za-z]")
+_XML_ENCODING = re.compile(rb"""^<\?xml[^>]*\sencoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+_CHARSET = re.compile(r"charset\s*=\s*[\"']?([A-Za-z0-9._-]+)", re.IGNORECASE)
+
+
+class UnsupportedFeed(Exception):
+    """
+    The document is not one the fast path handles; use feedparser instead.
+    """
+
+
+@dataclass(slots=True)
+class FeedEntry:
+    # None when the entry has no title element at all
+    title: Optional[str]
+    link: str
+    summary: str
+    published: Optional[datetime]
+
+
+def _check_prolog(body: bytes, headers: Dict[str, str]) -> None:
+    if body[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        raise UnsupportedFeed("UTF-16 document")
+    root = _ROOT_START.search(body)
+    if root is None:
+        raise UnsupportedFeed("no root element")
+    # Entity declarations live in the DOCTYPE; feedparser handles (and
+    # defuses) those, expat would expand them
+    if b"<!DOCTYPE" in body[: root.start()]:
+        raise UnsupportedFeed("DOCTYPE")
+
+    # For XML over HTTP the header charset wins over the declaration; only
+    # take the fast path when they agree
+    charset = _CHARSET.search(headers.get("content-type", ""))
+    if charset:
+        declared = _XML_ENCODING.match(body.lstrip(b"\xef\xbb\xbf"))
+        ours = (declared.group(1).decode("ascii") if declared else "utf-8").lower()
+        if charset.group(1).lower().replace("_", "-") != ours.replace("_", "-"):
+            raise UnsupportedFeed(f"charset {charset.group(1)} vs declared {ours}")
+
+
+def _text(elem: Optional[Element]) -> str:
+    if elem is None:
+        return ""
+    if len(elem):
+        raise UnsupportedFeed(f"markup inside <{elem.tag}>")
+    return (elem.text or "").strip()
+
+
+def _optional_text(elem: Optional[Element]) -> Optional[str]:
+    if elem is not None and elem.get("type") == "xhtml":
+        raise UnsupportedFeed("XHTML content")
+    return None if elem is None else _text(elem)
+
+
+def _rfc822(value: str) -> datetime:
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError) as exc:
+        raise UnsupportedFeed(f"date {value!r}") from exc
+    return _utc(dt)
+
+
+def _iso8601(value: str) -> datetime:
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise UnsupportedFeed(f"date {value!r}") from exc
+    return _utc(dt)
+
+
+def _utc(dt: datetime) -> datetime:
+    # Like feedparser: no offset means UTC; seconds precision
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _rss_item(item: Element, base_url: str) -> FeedEntry:
+    link = _text(item.find("link"))
+    if not link:
+        guid = item.find("guid")
+        if guid is not None and guid.get("isPermaLink", "true").lower() != "false":
+            link = _text(guid)
+
+    published = None
+    if (pub_date := _text(item.find("pubDate"))):
+        published = _rfc822(pub_date)
+    elif (dc_date := _text(item.find(DC_DATE))):
+        published = _iso8601(dc_date)
+
+    return FeedEntry(
+        title=_optional_text(item.find("title")),
+        link=urljoin(base_url, link) if link else "",
+        summary=_text(item.find("description")) or _text(item.find(CONTENT_ENCODED)),
+        published=published,
+    )
+
+
+def _atom_text(elem: Optional[Element]) -> str:
+    return _optional_text(elem) or ""
+
+
+def _atom_entry(entry: Element, base_url: str) -> FeedEntry:
+    link = ""
+    for candidate in entry.iterfind(f"{ATOM}link"):
+        if candidate.get("rel", "alternate") == "alternate":
+            link = (candidate.get("href") or "").strip()
+            break
+
+    published = None
+    if (stamp := _text(entry.find(f"{ATOM}published")) or _text(entry.find(f"{ATOM}updated"))):
+        published = _iso8601(stamp)
+
+    return FeedEntry(
+        title=_optional_text(entry.find(f"{ATOM}title")),
+        link=urljoin(base_url, link) if link else "",
+        summary=_atom_text(entry.find(f"{ATOM}summary")) or _atom_text(entry.find(f"{ATOM}content")),
+        published=published,
+    )
+
+
+def parse(body: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[List[FeedEntry], Optional[str]]:
+    """
+    Entries of an RSS 2.0 / Atom 1.0 feed, plus the channel's <ttl> text (or
+    None). Relative links resolve against the content-location header, as
+    with feedparser. Raises UnsupportedFeed when feedparser should be used.
+    """
+    headers = headers or {}
+    _check_prolog(body, headers)
+    base_url = headers.get("content-location", "")
+
+    entries: List[FeedEntry] = []
+    ttl: Optional[str] = None
+    stack: List[Element] = []
+    kind = None
+    try:
+        for event, elem in iterparse(BytesIO(body), events=("start", "end")):
+            if event == "start":
+                if kind is None:
+                    if elem.tag == "rss" and elem.get("version", "").startswith("2."):
+                        kind = "rss"
+                    elif elem.tag == f"{ATOM}feed":
+                        kind = "atom"
+                    else:
+                        raise UnsupportedFeed(f"root element {elem.tag}")
+                if XML_BASE in elem.attrib:
+                    raise UnsupportedFeed("xml:base")
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if kind == "rss" and elem.tag == "item":
+                entries.append(_rss_item(elem, base_url))
+            elif kind == "atom" and elem.tag == f"{ATOM}entry":
+                entries.append(_atom_entry(elem, base_url))
+            elif kind == "rss" and elem.tag == "ttl" and len(stack) == 2:
+                ttl = elem.text
+                continue
+            else:
+                continue
+            # Done with this entry: unhook it so the tree never holds more than one
+            if stack:
+                stack[-1].remove(elem)
+    except ParseError as exc:
+        raise UnsupportedFeed(f"malformed XML: {exc}") from exc
+    return entries, ttl
@@ -0,0 +1,84 @@
+# src/feed_cache.py
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+
+# Bump when the stored articles change shape (e.g. how Article.text is
+# derived); entries from another version are ignored and refetched
+CACHE_VERSION = 2
+
+
+@dataclass
+class CacheEntry:
+    """
+    What we remember about a feed between runs: its HTTP validators, a hash of
+    the last body we parsed, and the articles that body produced (as dicts).
+    """
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    # The feed's <ttl> (minutes), kept so 304s still carry the publisher's hint
+    ttl: Optional[int] = None
+    version: int = CACHE_VERSION
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Request headers that turn the next GET into a conditional one.
+        """
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def hash_body(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class FeedCache:
+    """
+    One small JSON file per feed URL under `directory`.
+    Files are replaced atomically, so concurrent fetch workers are safe.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def _path(self, url: str) -> Path:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return None
+            return CacheEntry(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as exc:
+            logging.warning("Ignoring unreadable feed cache %s: %s", path, exc)
+            return None
+
+    def put(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logging.warning("Could not write feed cache %s: %s", path, exc)
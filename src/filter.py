@@ -1,59 +1,268 @@
 # src/filter.py
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Set
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
-from .scraper import Article, fetch_all_feeds
-from .config import FEED_URLS, MACRO_KEYWORDS, MAX_ARTICLES
+from . import config
+from .scraper import Article
+from .dedupe import NearDuplicateIndex
+from .editions import Edition, keyword_masks
+from .matcher import get_matcher
+from .store import ArticleStore
+from .timeindex import TimeIndex, in_window, window_start
+
+
+def _recency_key(article: Article):
+    # Newest first, unknown timestamps last
+    return (article.published is not None, article.published)
+
+
+def iter_relevant(
+    articles: Iterable[Article],
+    keywords: Sequence[str],
+    store: Optional[ArticleStore] = None,
+    dedupe: Optional[NearDuplicateIndex] = None,
+) -> Iterator[Article]:
+    """
+    Lazily yield articles whose title or summary contains at least one keyword
+    (whole-word, case-insensitive); the matched keywords are stored on
+    article.keywords and their counts on article.keyword_counts.
+
+    Deduplicate by link (falling back to title if link is missing), or, when
+    an ArticleStore is given, upsert everything into it and keep only
+    articles it has not sent before. Nothing is marked sent here: the caller
+    does that (ArticleStore.mark_sent) once a send succeeds.
+
+    With a NearDuplicateIndex, near-identical stories from different sources
+    collapse into the first one seen, which lists the others in
+    article.related_sources.
+    """
+    matcher = get_matcher(keywords)
+    seen_keys: Set[str] = set()
+
+    try:
+        for article in articles:
+            if store is not None and not store.add(article):
+                continue
+
+            counts = matcher.count(f"{article.title}\n{article.text}")
+            if not counts:
+                continue
+
+            if store is None:
+                key = article.link or article.title
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+
+            if dedupe is not None and dedupe.add(article) is not None:
+                continue
+
+            # Counted in order of first appearance, so the keys are that order
+            article.keywords = list(counts)
+            article.keyword_counts = counts
+            yield article
+    finally:
+        if store is not None:
+            store.commit()
 
 
 def filter_articles(
     articles: Iterable[Article],
     keywords: Sequence[str],
     max_articles: int | None = None,
+    store: Optional[ArticleStore] = None,
+    dedupe: Optional[NearDuplicateIndex] = None,
+    ranking: str = "recency",
+    weights: Optional[Mapping[str, float]] = None,
+    half_life_hours: float = 0.0,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
 ) -> List[Article]:
     """
-    Keep only articles whose title or summary contains at least one keyword.
-    Deduplicate by link (falling back to title if link is missing).
-    Sort by published timestamp (newest first, unknown timestamps last).
-    Optionally cap the output to max_articles.
+    Keep the relevant articles (see iter_relevant) and rank them.
+
+    With `since` / `until`, only articles published in that window are
+    considered (undated ones are dropped). Given a TimeIndex kept across runs
+    (the daemon's) the window is a bisect over it; any other iterable is
+    filtered in a single streaming pass, as sorting it first would cost more
+    than the scan.
+
+    ranking="recency" sorts by published timestamp (newest first, unknown
+    timestamps last); the max_articles cap is applied with a bounded heap, so
+    `articles` can be a stream and only max_articles candidates are held at
+    once. ranking="bm25" scores every relevant article by keyword relevance
+    (optionally weighted, with a recency half-life) and keeps the best
+    max_articles; see scoring.rank_articles.
     """
-    lower_keywords = [k.lower() for k in keywords]
+    articles = _windowed(articles, since, until)
+    relevant = iter_relevant(articles, keywords, store=store, dedupe=dedupe)
+    return rank_relevant(
+        relevant,
+        keywords,
+        max_articles=max_articles,
+        ranking=ranking,
+        weights=weights,
+        half_life_hours=half_life_hours,
+    )
 
-    seen_keys: Set[str] = set()
-    filtered: List[Article] = []
 
-    for article in articles:
-        haystack = f"{article.title} {article.summary}".lower()
+def _windowed(
+    articles: Iterable[Article],
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> Iterable[Article]:
+    if isinstance(articles, TimeIndex):
+        return articles.window(since, until)
+    if since is not None or until is not None:
+        return in_window(articles, since, until)
+    return articles
+
+
+def rank_relevant(
+    relevant: Iterable[Article],
+    keywords: Sequence[str],
+    max_articles: int | None = None,
+    ranking: str = "recency",
+    weights: Optional[Mapping[str, float]] = None,
+    half_life_hours: float = 0.0,
+) -> List[Article]:
+    """
+    Rank already-matched articles and keep the best max_articles
+    (see filter_articles for the rankings).
+    """
+    if ranking == "bm25":
+        from .scoring import rank_articles
+
+        return rank_articles(
+            list(relevant),
+            keywords,
+            max_articles=max_articles,
+            weights=weights,
+            half_life_hours=half_life_hours,
+        )
+    if ranking != "recency":
+        raise ValueError(f"Unknown ranking {ranking!r}; expected 'recency' or 'bm25'")
+
+    if max_articles is None:
+        return sorted(relevant, key=_recency_key, reverse=True)
+
+    return heapq.nlargest(max_articles, relevant, key=_recency_key)
+
+
+def _configured_selection(
+    store: Optional[ArticleStore],
+) -> Tuple[Optional[datetime], Optional[NearDuplicateIndex], Optional[Dict[str, float]]]:
+    """
+    The (window start, near-duplicate index, keyword weights) that
+    TIME_WINDOW, NEAR_DUPLICATE_THRESHOLD and KEYWORD_WEIGHTS ask for.
+    """
+    since = window_start(config.TIME_WINDOW, last_issue_path=config.LAST_ISSUE_PATH)
+    if since is not None:
+        logging.info("Selecting articles published since %s", since.isoformat())
+
+    dedupe = None
+    if config.NEAR_DUPLICATE_THRESHOLD > 0:
+        dedupe = NearDuplicateIndex(threshold=config.NEAR_DUPLICATE_THRESHOLD)
+        if store is not None:
+            history_start = datetime.now(timezone.utc) - timedelta(days=config.DEDUPE_HISTORY_DAYS)
+            dedupe.seed(store.articles_since(history_start))
+            logging.info("Near-duplicate index seeded with %d stored stories", len(dedupe))
 
-        if not any(kw in haystack for kw in lower_keywords):
-            continue
+    weights = None
+    if config.KEYWORD_WEIGHTS:
+        from .scoring import parse_weights
 
-        key = article.link or article.title
-        if key in seen_keys:
-            continue
+        weights = parse_weights(config.KEYWORD_WEIGHTS, config.DEFAULT_KEYWORD_GROUPS)
 
-        seen_keys.add(key)
-        filtered.append(article)
+    return since, dedupe, weights
 
-    # Sort newest → oldest
-    filtered.sort(
-        key=lambda a: (a.published is not None, a.published),
-        reverse=True,
+
+def select_articles(
+    articles: Iterable[Article],
+    store: Optional[ArticleStore] = None,
+    max_articles: Optional[int] = None,
+) -> List[Article]:
+    """
+    filter_articles with everything taken from config: MACRO_KEYWORDS,
+    MAX_ARTICLES (unless max_articles is given), TIME_WINDOW, near-duplicate
+    clustering (seeded from the store's recent history when a store is given)
+    and the configured ranking.
+    """
+    since, dedupe, weights = _configured_selection(store)
+    return filter_articles(
+        articles,
+        config.MACRO_KEYWORDS,
+        max_articles=max_articles or config.MAX_ARTICLES,
+        store=store,
+        dedupe=dedupe,
+        ranking=config.RANKING,
+        weights=weights,
+        half_life_hours=config.RECENCY_HALF_LIFE_HOURS,
+        since=since,
     )
 
-    # Cap the list if requested
-    if max_articles is not None and len(filtered) > max_articles:
-        filtered = filtered[:max_articles]
 
-    return filtered
+def select_editions(
+    articles: Iterable[Article],
+    editions: Sequence[Edition],
+    store: Optional[ArticleStore] = None,
+) -> List[List[Article]]:
+    """
+    select_articles for several editions at once, returning each edition's
+    articles in the order of `editions`.
+
+    Articles are windowed, deduplicated and matched once, against the union of
+    every edition's keywords. The keywords an article matched give its
+    edition bitmask (article.editions, bit i = editions[i]), and only ranking
+    runs per edition, over that edition's candidates. An extra edition
+    therefore costs a few more trie branches and one more ranking pass, not
+    another scan of the corpus.
+    """
+    since, dedupe, weights = _configured_selection(store)
+    masks = keyword_masks(editions)
+    candidates: List[List[Article]] = [[] for _ in editions]
+
+    relevant = iter_relevant(_windowed(articles, since, None), list(masks), store=store, dedupe=dedupe)
+    for article in relevant:
+        mask = 0
+        for keyword in article.keywords:
+            mask |= masks[keyword]
+        article.editions = mask
+        for i in range(len(editions)):
+            if mask >> i & 1:
+                candidates[i].append(article)
+
+    selected: List[List[Article]] = []
+    for edition, pool in zip(editions, candidates):
+        chosen = rank_relevant(
+            pool,
+            edition.keywords,
+            max_articles=edition.max_articles,
+            ranking=config.RANKING,
+            weights=weights,
+            half_life_hours=config.RECENCY_HALF_LIFE_HOURS,
+        )
+        logging.info(
+            "Edition %s: %d of %d matching articles selected",
+            edition.name,
+            len(chosen),
+            len(pool),
+        )
+        selected.append(chosen)
+    return selected
 
 
 if __name__ == "__main__":
     # Manual test: run `python -m src.filter` from project root
-    import logging
     import sys
 
+    from .config import FEED_URLS, MAX_ARTICLES
+    from .scraper import fetch_all_feeds
+
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -64,7 +273,7 @@ if __name__ == "__main__":
     all_articles = fetch_all_feeds(FEED_URLS)
     logging.info("Fetched %d total articles", len(all_articles))
 
-    filtered = filter_articles(all_articles, MACRO_KEYWORDS, max_articles=MAX_ARTICLES)
+    filtered = select_articles(all_articles)
     logging.info(
         "After filtering, %d articles remain (capped at %d)",
         len(filtered),
@@ -0,0 +1,226 @@
+# src/formats.py
+"""
+The one renderer of the brief: a single pass over the selected articles
+that streams every requested format as it goes.
+
+- html: the email HTML, minified and held to EMAIL_BYTE_BUDGET (cards stop
+  once the next one would not fit)
+- text: the plain-text email, for the same articles as the HTML
+- web: the web view, every article, minified with repeated styles moved
+  into classes (written at the end, once all styles are known)
+- json_feed: a JSON Feed 1.1 (https://jsonfeed.org/version/1.1) of the brief
+- rss: an RSS 2.0 feed of the brief (needs SITE_URL for its channel link)
+
+stream_brief writes to any text streams; render_formats writes files, each
+to a temporary file that only replaces the target when its content
+differs. optimize.render_email / render_web are built on stream_brief, and
+artifacts.cached_render (the page build, the send) on render_formats.
+
+The feeds carry every selected article, with matched keywords and related
+sources, so consumers (a Slack bot, a dashboard) get structured data
+without scraping index.html. They hold nothing that changes between runs
+except the articles, so an unchanged brief gives byte-identical files.
+"""
+from __future__ import annotations
+
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO
+from xml.sax.saxutils import escape as xml_escape
+import json
+import logging
+
+from . import config
+from .artifacts import StagedFile
+from .email_builder import (
+    _EMPTY_HTML,
+    _EMPTY_TEXT,
+    _page_parts,
+    _render_fragments,
+    _text_head,
+    _text_item,
+)
+from .optimize import extract_styles, minify_html
+from .scraper import Article
+from .text import MAX_TEXT_CHARS, truncate_words
+
+# Names the page build publishes the feeds under, next to index.html
+JSON_FEED_NAME = "feed.json"
+RSS_NAME = "feed.xml"
+
+
+def _json_item(article: Article) -> Dict:
+    item: Dict = {
+        "id": article.link,
+        "url": article.link,
+        "title": article.title,
+        "content_text": truncate_words(article.text, MAX_TEXT_CHARS),
+        # JSON Feed extensions are underscore-prefixed objects
+        "_macro_brief": {
+            "source": article.source,
+            "related_sources": list(article.related_sources),
+        },
+    }
+    if article.published:
+        item["date_published"] = article.published.isoformat()
+    if article.keywords:
+        item["tags"] = list(article.keywords)
+    return item
+
+
+def _rss_item(article: Article) -> str:
+    parts = [
+        f"<title>{xml_escape(article.title)}</title>",
+        f"<link>{xml_escape(article.link)}</link>",
+        f"<guid>{xml_escape(article.link)}</guid>",
+        f"<description>{xml_escape(truncate_words(article.text, MAX_TEXT_CHARS))}</description>",
+    ]
+    if article.source.startswith(("http://", "https://")):
+        parts.append(f'<source url="{xml_escape(article.source)}">{xml_escape(article.source)}</source>')
+    if article.published:
+        parts.append(f"<pubDate>{format_datetime(article.published, usegmt=True)}</pubDate>")
+    parts.extend(f"<category>{xml_escape(k)}</category>" for k in article.keywords)
+    return "<item>" + "".join(parts) + "</item>"
+
+
+def stream_brief(
+    subject: str,
+    articles: Iterable[Article],
+    html: Optional[TextIO] = None,
+    text: Optional[TextIO] = None,
+    web: Optional[TextIO] = None,
+    json_feed: Optional[TextIO] = None,
+    rss: Optional[TextIO] = None,
+    budget: Optional[int] = None,
+    json_feed_name: str = JSON_FEED_NAME,
+    asset_base: str = "",
+) -> int:
+    """
+    Write the requested formats of the brief to their streams in one
+    traversal of `articles` (best first); formats without a stream are
+    skipped. `budget` (default EMAIL_BYTE_BUDGET; 0 = no limit) caps the
+    HTML email, and the text email follows it. `json_feed_name` is the
+    feed's file name under SITE_URL, for its feed_url. `asset_base`
+    prefixes the page's asset URLs (see email_builder._page_parts), for
+    pages not served from the site root. Returns how many articles made
+    the email.
+    """
+    if budget is None:
+        budget = config.EMAIL_BYTE_BUDGET
+    site_url = config.SITE_URL
+    if rss is not None and not site_url:
+        raise ValueError("An RSS feed needs SITE_URL for its channel <link>")
+
+    head, tail = (minify_html(part) for part in _page_parts(subject, asset_base))
+    # Bytes the HTML email will take with no (more) cards
+    html_bytes = len(head.encode("utf-8")) + len(tail.encode("utf-8"))
+    email_open = True
+    emailed = 0
+    web_cards: List[str] = []
+
+    if html is not None:
+        html.write(head)
+    if text is not None:
+        text.write(_text_head(subject))
+    if json_feed is not None:
+        header = {"version": "https://jsonfeed.org/version/1.1", "title": subject}
+        if site_url:
+            header["home_page_url"] = site_url
+            header["feed_url"] = site_url.rstrip("/") + "/" + json_feed_name
+        # Stream the items into the header object's "items" array
+        json_feed.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "items": [')
+    if rss is not None:
+        rss.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+            f"<title>{xml_escape(subject)}</title><link>{xml_escape(site_url)}</link>"
+            "<description>Curated macro &amp; markets headlines from major global sources.</description>"
+        )
+
+    count = 0
+    for article in articles:
+        card, block = _render_fragments(article)
+        if email_open or web is not None:
+            card = minify_html(card)
+        if web is not None:
+            web_cards.append(card)
+        if email_open:
+            card_bytes = len(card.encode("utf-8"))
+            if budget and html_bytes + card_bytes > budget:
+                email_open = False
+            else:
+                html_bytes += card_bytes
+                emailed += 1
+                if html is not None:
+                    html.write(card)
+                if text is not None:
+                    text.write(_text_item(emailed, block))
+        if json_feed is not None:
+            json_feed.write((", " if count else "") + json.dumps(_json_item(article), ensure_ascii=False))
+        if rss is not None:
+            rss.write(_rss_item(article))
+        count += 1
+
+    if html is not None:
+        html.write((minify_html(_EMPTY_HTML) if not emailed else "") + tail)
+    if text is not None and not emailed:
+        text.write(_EMPTY_TEXT)
+    if web is not None:
+        cards = "".join(web_cards) if web_cards else minify_html(_EMPTY_HTML)
+        web.write(extract_styles(head + cards + tail))
+    if json_feed is not None:
+        json_feed.write("]}\n")
+    if rss is not None:
+        rss.write("</channel></rss>\n")
+
+    if emailed < count and (html is not None or text is not None):
+        logging.warning(
+            "Email over the %d-byte budget; dropped the %d lowest-ranked articles (kept %d)",
+            budget,
+            count - emailed,
+            emailed,
+        )
+    return emailed
+
+
+def render_formats(
+    subject: str,
+    articles: Iterable[Article],
+    html: Optional[str | Path] = None,
+    text: Optional[str | Path] = None,
+    web: Optional[str | Path] = None,
+    json_feed: Optional[str | Path] = None,
+    rss: Optional[str | Path] = None,
+    budget: Optional[int] = None,
+    asset_base: str = "",
+) -> int:
+    """
+    stream_brief into files; formats without a path are skipped, and so is
+    the RSS feed when SITE_URL is empty. Files whose content is unchanged
+    are left alone. Returns how many articles made the email.
+    """
+    if rss and not config.SITE_URL:
+        logging.warning("SITE_URL is empty; not writing the RSS feed %s", rss)
+        rss = None
+
+    outputs: Dict[str, StagedFile] = {}
+    try:
+        for name, path in (("html", html), ("text", text), ("web", web), ("json_feed", json_feed), ("rss", rss)):
+            if path:
+                outputs[name] = StagedFile(path)
+        kept = stream_brief(
+            subject,
+            articles,
+            budget=budget,
+            asset_base=asset_base,
+            json_feed_name=Path(json_feed).name if json_feed else JSON_FEED_NAME,
+            **outputs,
+        )
+    except BaseException:
+        for output in outputs.values():
+            output.abort()
+        raise
+
+    for output in outputs.values():
+        output.commit()
+    logging.info("Rendered the brief to %s", ", ".join(str(o.path) for o in outputs.values()))
+    return kept
@@ -0,0 +1,238 @@
+# src/health.py
+"""
+Persistent feed health with a circuit breaker, so dead or flaky sources stop
+costing time on every run.
+
+For each feed we keep latency (EWMA), success/failure counts, the bozo
+(malformed feed) rate and when it last produced a new entry. After
+FEED_FAILURE_THRESHOLD consecutive failures the feed's breaker opens and
+fetch_all_feeds skips it for FEED_BREAKER_BASE_HOURS, doubling on every
+further failure up to FEED_BREAKER_MAX_HOURS. Once that time has passed the
+feed is tried again as a probe: success closes the breaker, failure re-opens
+it for longer.
+
+The registry is one JSON file (FEED_HEALTH_PATH). `python -m src.health`
+prints a report.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import json
+import logging
+import os
+import threading
+
+# Weight of the newest sample in the latency average
+_LATENCY_ALPHA = 0.3
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass
+class FeedHealth:
+    url: str
+    attempts: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    bozo: int = 0
+    latency_seconds: Optional[float] = None
+    last_success: Optional[str] = None
+    last_failure: Optional[str] = None
+    last_error: Optional[str] = None
+    # Newest entry timestamp seen, and when a newer one last turned up
+    newest_entry: Optional[str] = None
+    last_new_entries: Optional[str] = None
+    # Breaker is open (feed skipped) until this time
+    open_until: Optional[str] = None
+
+    def state(self, now: Optional[datetime] = None) -> str:
+        """
+        "closed" (healthy), "open" (being skipped) or "probe" (open, but due
+        for a recovery attempt).
+        """
+        open_until = _parse_time(self.open_until)
+        if open_until is None:
+            return "closed"
+        return "open" if (now or _now()) < open_until else "probe"
+
+    @property
+    def bozo_rate(self) -> float:
+        successes = self.attempts - self.failures
+        return self.bozo / successes if successes else 0.0
+
+
+class HealthRegistry:
+    def __init__(
+        self,
+        path: str | Path,
+        failure_threshold: int = 3,
+        base_hours: float = 24.0,
+        max_hours: float = 24.0 * 30,
+    ):
+        self.path = Path(path)
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_hours = base_hours
+        self.max_hours = max_hours
+        self._lock = threading.Lock()
+        self.feeds: Dict[str, FeedHealth] = self._load()
+
+    def _load(self) -> Dict[str, FeedHealth]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logging.warning("Ignoring unreadable feed health registry %s: %s", self.path, exc)
+            return {}
+        known = {f.name for f in fields(FeedHealth)}
+        return {
+            url: FeedHealth(**{k: v for k, v in entry.items() if k in known})
+            for url, entry in data.items()
+        }
+
+    def save(self) -> None:
+        with self._lock:
+            payload = json.dumps({url: asdict(h) for url, h in sorted(self.feeds.items())}, indent=1)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logging.warning("Could not write feed health registry %s: %s", self.path, exc)
+
+    def _get(self, url: str) -> FeedHealth:
+        health = self.feeds.get(url)
+        if health is None:
+            health = self.feeds[url] = FeedHealth(url=url)
+        return health
+
+    def allow(self, url: str, now: Optional[datetime] = None) -> bool:
+        """
+        False while the feed's breaker is open; True otherwise, including when
+        it is due for a probe.
+        """
+        with self._lock:
+            health = self.feeds.get(url)
+        return health is None or health.state(now) != "open"
+
+    def partition(self, urls: Sequence[str]) -> List[str]:
+        """
+        The URLs to fetch this run, logging the ones skipped.
+        """
+        now = _now()
+        allowed = []
+        for url in urls:
+            if self.allow(url, now):
+                if self.feeds.get(url) and self.feeds[url].state(now) == "probe":
+                    logging.info("Probing unhealthy feed %s", url)
+                allowed.append(url)
+            else:
+                logging.info(
+                    "Skipping unhealthy feed %s until %s", url, self.feeds[url].open_until
+                )
+        return allowed
+
+    def record_success(
+        self,
+        url: str,
+        seconds: float,
+        bozo: bool = False,
+        newest_entry: Optional[datetime] = None,
+    ) -> None:
+        now = _now()
+        with self._lock:
+            health = self._get(url)
+            health.attempts += 1
+            health.bozo += int(bozo)
+            health.latency_seconds = (
+                seconds
+                if health.latency_seconds is None
+                else _LATENCY_ALPHA * seconds + (1 - _LATENCY_ALPHA) * health.latency_seconds
+            )
+            health.last_success = now.isoformat()
+            if health.open_until:
+                logging.info("Feed %s recovered; closing its circuit breaker", url)
+            health.consecutive_failures = 0
+            health.open_until = None
+
+            previous = _parse_time(health.newest_entry)
+            if newest_entry is not None and (previous is None or newest_entry > previous):
+                health.newest_entry = newest_entry.isoformat()
+                health.last_new_entries = now.isoformat()
+
+    def record_failure(self, url: str, error: str) -> None:
+        now = _now()
+        with self._lock:
+            health = self._get(url)
+            health.attempts += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_failure = now.isoformat()
+            health.last_error = error[:300]
+
+            excess = health.consecutive_failures - self.failure_threshold
+            if excess >= 0:
+                hours = min(self.max_hours, self.base_hours * (2 ** excess))
+                health.open_until = (now + timedelta(hours=hours)).isoformat()
+                logging.warning(
+                    "Feed %s failed %d times in a row; skipping it for %.0fh",
+                    url,
+                    health.consecutive_failures,
+                    hours,
+                )
+
+
+def registry_from_config() -> Optional[HealthRegistry]:
+    from . import config
+
+    # A replay must fetch exactly what was recorded, and says nothing about
+    # the live feeds' health
+    if not config.FEED_HEALTH_PATH or config.SNAPSHOT_MODE == "replay":
+        return None
+    return HealthRegistry(
+        config.FEED_HEALTH_PATH,
+        failure_threshold=config.FEED_FAILURE_THRESHOLD,
+        base_hours=config.FEED_BREAKER_BASE_HOURS,
+        max_hours=config.FEED_BREAKER_MAX_HOURS,
+    )
+
+
+def format_report(registry: HealthRegistry) -> str:
+    now = _now()
+    lines = [
+        f"{'state':<7} {'ok':>5} {'fail':>5} {'bozo%':>6} {'latency':>8}  {'last new entries':<17} url"
+    ]
+    order = {"open": 0, "probe": 1, "closed": 2}
+    for health in sorted(registry.feeds.values(), key=lambda h: (order[h.state(now)], h.url)):
+        latency = f"{health.latency_seconds:.2f}s" if health.latency_seconds is not None else "-"
+        last_new = (health.last_new_entries or "-")[:16]
+        lines.append(
+            f"{health.state(now):<7} {health.attempts - health.failures:>5} {health.failures:>5} "
+            f"{health.bozo_rate * 100:>5.0f}% {latency:>8}  {last_new:<17} {health.url}"
+        )
+        if health.state(now) != "closed":
+            lines.append(f"{'':<7} until {health.open_until}: {health.last_error}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Health report: run `python -m src.health` from project root
+    registry = registry_from_config()
+    if registry is None:
+        print("FEED_HEALTH_PATH is empty; feed health tracking is off")
+    elif not registry.feeds:
+        print(f"No feed health recorded yet in {registry.path}")
+    else:
+        print(format_report(registry))
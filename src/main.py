@@ -4,12 +4,16 @@ from __future__ import annotations
 import logging
 import sys
 from datetime import datetime, timezone
+from typing import List, Optional, Sequence
 
-from . import config
-from .scraper import fetch_all_feeds
-from .filter import filter_articles
-from .email_builder import build_html_email, build_text_email
+from . import config, metrics
+from .scraper import Article, fetch_all_feeds, iter_all_feeds
+from .artifacts import cached_render, cached_selections
+from .editions import Edition, load_editions
 from .send_email import send_newsletter
+from .store import ArticleStore
+from .timeindex import mark_issue
+from .transport import close_shared
 
 
 def configure_logging() -> None:
@@ -24,35 +28,96 @@ def run() -> None:
     configure_logging()
     logging.info("Starting Daily Macro Brief run (local send test)")
 
+    report = metrics.start_run(profile_dir=config.PROFILE_DIR, trace_memory=config.TRACE_MEMORY)
+    try:
+        _run(report)
+    finally:
+        close_shared()
+        metrics.finish_run(config.RUN_REPORT_PATH, config.PROMETHEUS_TEXTFILE)
+
+
+def _run(report: metrics.RunReport) -> None:
+    # The next TIME_WINDOW=last-issue run picks up from when this one started
+    started = datetime.now(timezone.utc)
     logging.info("Using feeds: %s", config.FEED_URLS)
-    all_articles = fetch_all_feeds(config.FEED_URLS)
-    logging.info("Fetched total %d articles", len(all_articles))
+    if config.STREAM_PIPELINE:
+        # Articles flow from each feed into the filter as soon as it is parsed,
+        # so fetching is timed as part of the filter stage
+        all_articles = iter_all_feeds(config.FEED_URLS)
+    else:
+        with report.stage("fetch") as stage:
+            all_articles = fetch_all_feeds(config.FEED_URLS)
+            stage["articles"] = len(all_articles)
+        logging.info("Fetched total %d articles", len(all_articles))
 
-    filtered = filter_articles(
-        all_articles,
-        config.MACRO_KEYWORDS,
-        max_articles=config.MAX_ARTICLES,
-    )
-    logging.info(
-        "Filtered down to %d macro-relevant articles (max %d)",
-        len(filtered),
-        config.MAX_ARTICLES,
-    )
+    editions = load_editions()
+    store = ArticleStore(config.ARTICLE_DB) if config.ARTICLE_DB else None
+    try:
+        with report.stage("filter") as stage:
+            # One matching pass for all editions (see filter.select_editions),
+            # or none if the page build already filtered the same articles
+            selections = cached_selections(all_articles, editions, store=store)
+            stage["articles"] = sum(len(s) for s in selections)
+
+        _send_editions(report, editions, selections, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    mark_issue(config.LAST_ISSUE_PATH, started)
+    logging.info("Newsletter send completed.")
 
-    if not filtered:
-        logging.info("No relevant articles found; sending empty brief anyway.")
 
+def _send_editions(
+    report: metrics.RunReport,
+    editions: Sequence[Edition],
+    selections: List[List[Article]],
+    store: Optional[ArticleStore],
+) -> None:
     today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    subject = f"{config.NEWSLETTER_SUBJECT} — {today_str}"
+    failed = []
+    for edition, filtered in zip(editions, selections):
+        # Stage names stay "render" / "send" for the classic single brief
+        suffix = f":{edition.name}" if len(editions) > 1 else ""
+        logging.info(
+            "Edition %s: %d macro-relevant articles (max %d)",
+            edition.name,
+            len(filtered),
+            edition.max_articles,
+        )
+        if not filtered:
+            logging.info("No relevant articles found; sending empty brief anyway.")
 
-    html_body = build_html_email(subject, filtered)
-    text_body = build_text_email(subject, filtered)
+        subject = f"{edition.subject} — {today_str}"
 
-    logging.info("Sending newsletter to %d recipients", len(config.TO_EMAILS))
-    send_newsletter(config.TO_EMAILS, subject, html_body, text_body)
+        with report.stage("render" + suffix) as stage:
+            # Minified, and trimmed to EMAIL_BYTE_BUDGET if need be. Streamed
+            # to files once (or reused from the page build); only the two
+            # bodies SendGrid needs are read back
+            rendered = cached_render(subject, filtered)
+            html_body = rendered.html.read_text(encoding="utf-8")
+            text_body = rendered.text.read_text(encoding="utf-8")
+            stage["html_bytes"] = len(html_body.encode("utf-8"))
 
-    logging.info("Newsletter send completed.")
+        logging.info("Sending edition %s to %d recipients", edition.name, len(edition.recipients))
+        try:
+            with report.stage("send" + suffix) as stage:
+                results = send_newsletter(edition.recipients, subject, html_body, text_body)
+                stage["batches"] = len(results)
+        except Exception as exc:
+            # Don't let one edition's failure stop the others from going out
+            logging.error("Sending edition %s failed: %s", edition.name, exc)
+            failed.append(edition.name)
+            continue
+
+        if store is not None:
+            # Only now do these articles count as seen; the ones the byte
+            # budget dropped stay eligible for the next run
+            store.mark_sent(filtered[: rendered.kept])
+
+    if failed:
+        raise RuntimeError(f"Sending failed for editions: {', '.join(failed)}")
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,107 @@
+# src/matcher.py
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Sequence
+import re
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Lower-case a keyword and collapse its internal whitespace.
+    """
+    return " ".join(keyword.lower().split())
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """
+    Compile the words into a single regex shaped like a trie, e.g.
+    ["rate cut", "rate hike"] -> "rate\\s+(?:cut|hike)". Python's regex engine
+    tries alternatives one by one, so sharing prefixes keeps the work per
+    position proportional to the text, not to the number of keywords.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def node_pattern(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + node_pattern(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if terminal else group
+
+    return node_pattern(trie)
+
+
+class KeywordMatcher:
+    """
+    Whole-word, case-insensitive matcher for a fixed keyword list.
+    Built once, then each text is scanned in a single regex pass.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        normalized = {normalize_keyword(k) for k in keywords}
+        normalized.discard("")
+        self.keywords: List[str] = sorted(normalized)
+
+        if self.keywords:
+            # The lookahead makes matches zero-width, so overlapping keywords
+            # ("interest rate" / "rate cut") are all reported.
+            pattern = r"(?<!\w)(?=(%s)(?!\w))" % _trie_pattern(self.keywords)
+            self._regex = re.compile(pattern)
+        else:
+            self._regex = None
+
+    def find(self, text: str) -> List[str]:
+        """
+        Return the keywords found in `text`, in order of first appearance.
+        """
+        if self._regex is None or not text:
+            return []
+        found: Dict[str, None] = {}
+        for match in self._regex.finditer(text.lower()):
+            found.setdefault(normalize_keyword(match.group(1)), None)
+        return list(found)
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Return how many times each keyword occurs in `text`.
+        """
+        counts: Dict[str, int] = {}
+        if self._regex is None or not text:
+            return counts
+        for match in self._regex.finditer(text.lower()):
+            keyword = normalize_keyword(match.group(1))
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def search(self, text: str) -> bool:
+        """
+        True if `text` contains at least one keyword.
+        """
+        if self._regex is None or not text:
+            return False
+        return self._regex.search(text.lower()) is not None
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: Sequence[str]) -> KeywordMatcher:
+    """
+    Shared matcher for a keyword list, compiled on first use.
+    """
+    return _cached_matcher(tuple(keywords))
@@ -0,0 +1,178 @@
+# src/metrics.py
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+
+class RunReport:
+    """
+    Structured timings for one pipeline run: a record per feed fetched and a
+    record per stage (wall time, optional tracemalloc peak, optional cProfile
+    dump).
+
+    cProfile only sees the thread that entered the stage. Work the stage
+    hands to pool threads (the fetch stage's downloads and parsing) shows up
+    as time waiting on futures, not as the functions that ran; use the
+    per-feed records (seconds, parse_seconds) for that.
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None, trace_memory: bool = False):
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+        self.feeds: List[Dict[str, Any]] = []
+        self.extra: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block. The yielded dict can be used to attach extra
+        fields (e.g. item counts) to the stage record.
+        """
+        record: Dict[str, Any] = {"name": name}
+        profiler = cProfile.Profile() if self.profile_dir else None
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            record["seconds"] = time.perf_counter() - start
+            if self.trace_memory and tracemalloc.is_tracing():
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            if profiler:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                path = self.profile_dir / f"{name}.pstats"
+                profiler.dump_stats(str(path))
+                record["profile"] = str(path)
+            with self._lock:
+                self.stages.append(record)
+            logging.info("Stage %s took %.2fs", name, record["seconds"])
+
+    def record_feed(self, **fields: Any) -> None:
+        with self._lock:
+            self.feeds.append(fields)
+
+    def finish(self) -> None:
+        self.extra["total_seconds"] = time.perf_counter() - self._t0
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            **self.extra,
+            "stages": self.stages,
+            "feeds": self.feeds,
+        }
+
+    def write_json(self, path: str) -> None:
+        _atomic_write(path, json.dumps(self.to_dict(), indent=2, default=str) + "\n")
+        logging.info("Wrote run report to %s", path)
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Export in the node_exporter textfile-collector format.
+        """
+        lines = [
+            "# TYPE macro_newsletter_last_run_timestamp_seconds gauge",
+            f"macro_newsletter_last_run_timestamp_seconds {self.started_at.timestamp():.0f}",
+            "# TYPE macro_newsletter_run_seconds gauge",
+            f"macro_newsletter_run_seconds {self.extra.get('total_seconds', 0):.6f}",
+            "# TYPE macro_newsletter_stage_seconds gauge",
+        ]
+        lines += [
+            f'macro_newsletter_stage_seconds{{stage="{_label(s["name"])}"}} {s["seconds"]:.6f}'
+            for s in self.stages
+        ]
+        lines.append("# TYPE macro_newsletter_stage_peak_bytes gauge")
+        lines += [
+            f'macro_newsletter_stage_peak_bytes{{stage="{_label(s["name"])}"}} {s["peak_bytes"]}'
+            for s in self.stages
+            if "peak_bytes" in s
+        ]
+        for metric, key in (
+            ("feed_seconds", "seconds"),
+            ("feed_bytes", "bytes"),
+            ("feed_entries", "entries"),
+            ("feed_parse_seconds", "parse_seconds"),
+        ):
+            lines.append(f"# TYPE macro_newsletter_{metric} gauge")
+            lines += [
+                f'macro_newsletter_{metric}{{feed="{_label(f["url"])}"}} {f.get(key) or 0}'
+                for f in self.feeds
+            ]
+        _atomic_write(path, "\n".join(lines) + "\n")
+        logging.info("Wrote Prometheus metrics to %s", path)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: str, content: str) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, target)
+
+
+# The report for the run in progress, if any. Lower layers (the scraper)
+# call record_feed() without needing a report threaded through to them.
+_current: Optional[RunReport] = None
+
+
+def start_run(profile_dir: Optional[str] = None, trace_memory: bool = False) -> RunReport:
+    global _current
+    _current = RunReport(profile_dir=profile_dir, trace_memory=trace_memory)
+    return _current
+
+
+def current() -> Optional[RunReport]:
+    return _current
+
+
+def record_feed(**fields: Any) -> None:
+    """
+    Record per-feed stats on the current run; a no-op outside an instrumented run.
+    """
+    if _current is not None:
+        _current.record_feed(**fields)
+
+
+def finish_run(json_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+    global _current
+    report, _current = _current, None
+    if report is None:
+        return
+    report.finish()
+    if json_path:
+        report.write_json(json_path)
+    if prometheus_path:
+        report.write_prometheus(prometheus_path)
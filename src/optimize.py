@@ -0,0 +1,189 @@
+# src/optimize.py
+"""
+Post-render optimization of the HTML brief.
+
+- minify_html: drops comments and template indentation, collapses
+  whitespace and compacts inline style declarations. Safe for email.
+- extract_styles: for the web view only, moves every style="..." used more
+  than once into a class in a <style> block. Email keeps inline styles, since
+  several clients (Gmail for non-Google accounts, older Outlook) ignore or
+  strip <style> blocks.
+- fit_email / render_email / render_web: the email (held to
+  EMAIL_BYTE_BUDGET, since Gmail clips messages past ~102KB, by dropping the
+  lowest-ranked articles) and the web view, rendered by
+  formats.stream_brief.
+- write_precompressed / precompress: write a page plus .gz (and .br when
+  the brotli package is installed) copies for static hosting, streaming
+  the copies from the page file.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import gzip
+import io
+import re
+import shutil
+
+from .scraper import Article
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # optional
+    brotli = None
+
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_STYLE_ATTR = re.compile(r'style="([^"]*)"')
+_WHITESPACE = re.compile(r"\s+")
+# Whitespace next to these tags never renders, so it can go entirely
+_BLOCK_TAG = re.compile(
+    r"\s*(</?(?:!DOCTYPE|html|head|body|meta|title|style|table|tbody|tr|td|div|h1|p)\b[^>]*>)\s*",
+    re.IGNORECASE,
+)
+
+
+def _compact_style(style: str) -> str:
+    declarations = []
+    for declaration in style.split(";"):
+        prop, sep, value = declaration.partition(":")
+        if sep and prop.strip():
+            declarations.append(f"{prop.strip().lower()}:{_WHITESPACE.sub(' ', value.strip())}")
+    return ";".join(declarations)
+
+
+def minify_html(html: str) -> str:
+    """
+    Strip comments and indentation and compact inline styles. The brief has
+    no <pre>, <textarea> or <script>, whose whitespace would matter.
+    """
+    html = _COMMENT.sub("", html)
+    html = _STYLE_ATTR.sub(lambda m: f'style="{_compact_style(m.group(1))}"', html)
+    html = _WHITESPACE.sub(" ", html)
+    return _BLOCK_TAG.sub(r"\1", html).strip()
+
+
+def extract_styles(html: str, min_uses: int = 2) -> str:
+    """
+    Replace each inline style used at least `min_uses` times with a shared
+    class, defined once in a <style> block in <head>. Expects minified HTML
+    (one style string per distinct declaration list).
+    """
+    counts: Dict[str, int] = {}
+    for match in _STYLE_ATTR.finditer(html):
+        counts[match.group(1)] = counts.get(match.group(1), 0) + 1
+
+    classes: Dict[str, str] = {}
+    for style, uses in sorted(counts.items(), key=lambda item: -item[1]):
+        if uses >= min_uses and style:
+            classes[style] = f"s{len(classes)}"
+    if not classes:
+        return html
+
+    html = _STYLE_ATTR.sub(
+        lambda m: f'class="{classes[m.group(1)]}"' if m.group(1) in classes else m.group(0),
+        html,
+    )
+    css = "".join(f".{name}{{{style}}}" for style, name in classes.items())
+    return html.replace("</head>", f"<style>{css}</style></head>", 1)
+
+
+def fit_email(
+    subject: str,
+    articles: Sequence[Article],
+    budget: Optional[int] = None,
+) -> Tuple[str, List[Article]]:
+    """
+    Minified email HTML for as many of `articles` (best first) as fit in
+    `budget` bytes (default: EMAIL_BYTE_BUDGET; 0 = no limit). Returns the
+    HTML and the articles kept, so the text part can match.
+    """
+    from .formats import stream_brief
+
+    articles = list(articles)
+    html = io.StringIO()
+    kept = stream_brief(subject, articles, html=html, budget=budget)
+    return html.getvalue(), articles[:kept]
+
+
+def render_email(subject: str, articles: Sequence[Article]) -> Tuple[str, str]:
+    """
+    (html, text) bodies for sending: budgeted, minified, inline styles.
+    """
+    from .formats import stream_brief
+
+    html, text = io.StringIO(), io.StringIO()
+    stream_brief(subject, articles, html=html, text=text)
+    return html.getvalue(), text.getvalue()
+
+
+def render_web(subject: str, articles: Sequence[Article], asset_base: str = "") -> str:
+    """
+    The web view: minified, with repeated styles moved into classes.
+    `asset_base` is the page's path to the site root, e.g. "../".
+    """
+    from .formats import stream_brief
+
+    web = io.StringIO()
+    stream_brief(subject, articles, web=web, asset_base=asset_base)
+    return web.getvalue()
+
+
+def write_precompressed(path: str | Path, content: str, compress: Optional[bool] = None) -> List[Path]:
+    """
+    Write `content` to `path` (unless unchanged), then its compressed
+    copies (see precompress). Returns the paths.
+    """
+    from .artifacts import write_if_changed
+
+    write_if_changed(path, content)
+    return precompress(path, compress)
+
+
+def precompress(path: str | Path, compress: Optional[bool] = None) -> List[Path]:
+    """
+    Stream the page at `path` into path.gz and, with brotli installed,
+    path.br (unless `compress`, default PRECOMPRESS_PAGES, is off). gzip's
+    mtime is fixed so unchanged pages produce identical files, and files
+    whose content is unchanged are left alone. Returns the page's path plus
+    the copies.
+    """
+    if compress is None:
+        from . import config
+
+        compress = config.PRECOMPRESS_PAGES
+
+    from .artifacts import StagedFile
+
+    path = Path(path)
+    written = [path]
+    if not compress:
+        return written
+
+    gz_path = path.with_name(path.name + ".gz")
+    output = StagedFile(gz_path, binary=True)
+    try:
+        with open(path, "rb") as page, gzip.GzipFile(
+            filename="", mode="wb", compresslevel=9, fileobj=output, mtime=0
+        ) as gz:
+            shutil.copyfileobj(page, gz)
+    except BaseException:
+        output.abort()
+        raise
+    output.commit()
+    written.append(gz_path)
+
+    if brotli is not None:
+        br_path = path.with_name(path.name + ".br")
+        output = StagedFile(br_path, binary=True)
+        try:
+            compressor = brotli.Compressor(quality=11)
+            with open(path, "rb") as page:
+                for chunk in iter(lambda: page.read(1 << 16), b""):
+                    output.write(compressor.process(chunk))
+            output.write(compressor.finish())
+        except BaseException:
+            output.abort()
+            raise
+        output.commit()
+        written.append(br_path)
+    return written
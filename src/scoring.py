@@ -0,0 +1,138 @@
+# src/scoring.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from .matcher import get_matcher, normalize_keyword
+from .scraper import Article
+from .timeindex import as_utc
+
+
+def parse_weights(
+    spec: str,
+    groups: Optional[Mapping[str, Sequence[str]]] = None,
+) -> Dict[str, float]:
+    """
+    Parse "fomc:3, rate cut:2, monetary:1.5"-style weights.
+    A name that matches a keyword group (e.g. "monetary") applies to every
+    keyword in that group; explicit keyword weights win over group weights.
+    """
+    groups = groups or {}
+    group_weights: Dict[str, float] = {}
+    keyword_weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, sep, value = item.rpartition(":")
+        if not sep or not name.strip():
+            continue
+        name = normalize_keyword(name)
+        weight = float(value)
+        if name in groups:
+            for keyword in groups[name]:
+                group_weights[normalize_keyword(keyword)] = weight
+        else:
+            keyword_weights[name] = weight
+    return {**group_weights, **keyword_weights}
+
+
+def score_articles(
+    articles: Sequence[Article],
+    keywords: Sequence[str],
+    weights: Optional[Mapping[str, float]] = None,
+    half_life_hours: float = 0.0,
+    now: Optional[datetime] = None,
+    k1: float = 1.2,
+    b: float = 0.75,
+):
+    """
+    BM25 relevance of each article over the keyword vocabulary, as a NumPy
+    array aligned with `articles`.
+
+    Keyword counts go into an (articles x keywords) matrix; IDF, length
+    normalisation, per-keyword weights and the recency decay are then whole-
+    batch array operations. With half_life_hours > 0, a story's score halves
+    for every half-life of age; undated stories get the oldest dated age.
+    """
+    import numpy as np
+
+    matcher = get_matcher(keywords)
+    vocabulary = {kw: j for j, kw in enumerate(matcher.keywords)}
+    n, m = len(articles), len(vocabulary)
+    if n == 0 or m == 0:
+        return np.zeros(n)
+
+    # Counts come from the filter's matching pass (article.keyword_counts);
+    # only articles that never went through it are scanned here
+    rows: List[int] = []
+    cols: List[int] = []
+    values: List[int] = []
+    doc_len = np.empty(n, dtype=np.float64)
+    for i, article in enumerate(articles):
+        text = f"{article.title}\n{article.text}"
+        doc_len[i] = max(len(text.split()), 1)
+        for keyword, count in (article.keyword_counts or matcher.count(text)).items():
+            j = vocabulary.get(keyword)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+                values.append(count)
+    tf = np.zeros((n, m), dtype=np.float64)
+    tf[rows, cols] = values
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    length_norm = k1 * (1.0 - b + b * doc_len / doc_len.mean())
+    bm25 = tf * (k1 + 1.0) / (tf + length_norm[:, None])
+
+    weight_vector = np.ones(m)
+    for keyword, weight in (weights or {}).items():
+        j = vocabulary.get(normalize_keyword(keyword))
+        if j is not None:
+            weight_vector[j] = weight
+
+    scores = bm25 @ (idf * weight_vector)
+
+    if half_life_hours > 0:
+        now = now or datetime.now(timezone.utc)
+        ages = np.array(
+            [
+                (now - as_utc(a.published)).total_seconds() / 3600.0
+                if a.published
+                else np.nan
+                for a in articles
+            ]
+        )
+        if np.isnan(ages).all():
+            ages[:] = 0.0
+        else:
+            ages[np.isnan(ages)] = np.nanmax(ages)
+        scores = scores * np.power(0.5, np.clip(ages, 0.0, None) / half_life_hours)
+
+    return scores
+
+
+def rank_articles(
+    articles: Sequence[Article],
+    keywords: Sequence[str],
+    max_articles: Optional[int] = None,
+    weights: Optional[Mapping[str, float]] = None,
+    half_life_hours: float = 0.0,
+    now: Optional[datetime] = None,
+) -> List[Article]:
+    """
+    Order articles by BM25 score (highest first), keeping the top max_articles.
+    Ties keep their input order.
+    """
+    import numpy as np
+
+    articles = list(articles)
+    scores = score_articles(articles, keywords, weights, half_life_hours, now)
+
+    if max_articles is not None and max_articles < len(articles):
+        top = np.argpartition(-scores, max_articles - 1)[:max_articles]
+    else:
+        top = np.arange(len(articles))
+    top.sort()
+    # Stable sort on the (small) selection only
+    order = top[np.argsort(-scores[top], kind="stable")]
+    return [articles[i] for i in order]
@@ -1,24 +1,77 @@
 # src/scraper.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional, Sequence
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FuturesTimeout,
+    as_completed,
+)
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
 import time
 
-import feedparser
+from . import config, metrics
+from .feed_cache import CacheEntry, FeedCache, hash_body
+from .health import HealthRegistry, registry_from_config
+from .snapshots import active_store
+from .text import summary_text
+from .transport import shared_transport
 
-from .config import FEED_URLS
+USER_AGENT = "macro-newsletter/1.0 (+https://github.com/parthm14/macro-newsletter-)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     title: str
     link: str
     source: str
     published: Optional[datetime]
     summary: str
+    # Keywords that matched this article, filled in by filter_articles
+    keywords: List[str] = field(default_factory=list)
+    # How often each of those keywords occurs, from the same matching pass
+    # (the term frequencies BM25 ranking needs)
+    keyword_counts: Dict[str, int] = field(default_factory=dict)
+    # Other sources carrying the same story, filled in by near-duplicate clustering
+    related_sources: List[str] = field(default_factory=list)
+    # Bitmask of the editions this article belongs to, filled in by select_editions
+    editions: int = 0
+    # Plain-text summary (tags stripped, entities unescaped, whitespace
+    # collapsed), computed once at ingest and shared by the filter and the
+    # renderers. Kept whole for matching; renderers truncate for display
+    text: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.text and self.summary:
+            self.text = summary_text(self.summary)
+
+
+def article_to_dict(article: Article) -> Dict[str, Any]:
+    """
+    JSON-friendly representation of an Article (datetimes as ISO strings).
+    """
+    data = asdict(article)
+    if article.published is not None:
+        data["published"] = article.published.isoformat()
+    return data
+
+
+def article_from_dict(data: Dict[str, Any]) -> Article:
+    """
+    Inverse of article_to_dict.
+    """
+    data = dict(data)
+    if data.get("published"):
+        published = datetime.fromisoformat(data["published"])
+        # Older caches and stores hold naive timestamps, which were meant as UTC
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        data["published"] = published
+    return Article(**data)
 
 
 def _parse_entry(entry, source: str) -> Article:
@@ -29,11 +82,13 @@ def _parse_entry(entry, source: str) -> Article:
     link = entry.get("link", "")
     summary = entry.get("summary", "") or entry.get("description", "")
 
-    # Parse published/updated timestamp if available
+    # Parse published/updated timestamp if available. feedparser normalizes
+    # these to UTC, so build an aware UTC datetime (time.mktime would read
+    # the struct as local time and skew it by the machine's UTC offset).
     published_dt: Optional[datetime] = None
     struct_time = entry.get("published_parsed") or entry.get("updated_parsed")
     if struct_time:
-        published_dt = datetime.fromtimestamp(time.mktime(struct_time))
+        published_dt = datetime(*struct_time[:6], tzinfo=timezone.utc)
 
     return Article(
         title=title,
@@ -44,17 +99,98 @@ def _parse_entry(entry, source: str) -> Article:
     )
 
 
-def fetch_feed(url: str, source_name: Optional[str] = None) -> List[Article]:
+def _download(
+    url: str,
+    timeout: Optional[float] = None,
+    request_headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, bytes, Dict[str, str]]:
     """
-    Fetch a single RSS/Atom feed and return a list of Article objects.
+    Download a feed body, returning the HTTP status, raw bytes and lower-cased
+    response headers. A 304 Not Modified comes back as (304, b"", headers).
+
+    With SNAPSHOT_MODE=replay the response comes from the saved snapshot
+    instead of the network; with SNAPSHOT_MODE=record it is saved to one.
     """
-    source = source_name or url
-    logging.info("Fetching feed: %s", url)
+    snapshot = active_store()
+    if snapshot is not None and config.SNAPSHOT_MODE == "replay":
+        return snapshot.replay(url)
 
-    parsed = feedparser.parse(url)
+    status, body, headers = _http_get(url, timeout, request_headers)
+    if snapshot is not None:
+        snapshot.record(url, status, body, headers)
+    return status, body, headers
 
-    if parsed.bozo:
-        logging.warning("Feed parse issue for %s: %s", url, parsed.bozo_exception)
+
+def _http_get(
+    url: str,
+    timeout: Optional[float] = None,
+    request_headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    HTTP GET for _download over the shared keep-alive transport (compressed
+    transfer, FEED_MAX_BYTES cap). The timeout applies to the connect and to
+    each socket read.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    headers.update(request_headers or {})
+    status, body, response_headers, final_url = shared_transport().get(
+        url,
+        headers=headers,
+        timeout=timeout,
+        max_bytes=config.FEED_MAX_BYTES,
+    )
+    # Lets feedparser resolve relative links against the final URL
+    response_headers.setdefault("content-location", final_url)
+    return status, body, response_headers
+
+
+def _feed_ttl(value: Any) -> Optional[int]:
+    try:
+        ttl = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return ttl if ttl > 0 else None
+
+
+def _parse_body(
+    body: bytes,
+    headers: Dict[str, str],
+    source: str,
+) -> Tuple[List[Article], Optional[str], float, Optional[int]]:
+    """
+    Parse a downloaded feed body into Articles.
+    Returns (articles, bozo message or None, parse seconds, the feed's <ttl>
+    in minutes or None). Well-formed RSS 2.0 / Atom goes through the
+    streaming fast path (FAST_PARSE, see src/fastparse.py), anything else
+    through feedparser. Module-level and
+    free of shared state so it can run in a worker process; the results are
+    plain picklable values.
+    """
+    started = time.perf_counter()
+    if config.FAST_PARSE:
+        from .fastparse import UnsupportedFeed, parse
+
+        try:
+            entries, ttl_text = parse(body, headers)
+        except UnsupportedFeed as exc:
+            logging.debug("Parsing %s with feedparser: %s", source, exc)
+        else:
+            articles = [
+                Article(
+                    title="(no title)" if e.title is None else e.title,
+                    link=e.link,
+                    source=source,
+                    published=e.published,
+                    summary=e.summary,
+                )
+                for e in entries
+            ]
+            return articles, None, time.perf_counter() - started, _feed_ttl(ttl_text)
+
+    # Imported here so that commands which never parse feeds start faster
+    import feedparser
+
+    parsed = feedparser.parse(body, response_headers=headers)
 
     articles: List[Article] = []
     for entry in parsed.entries:
@@ -64,22 +200,363 @@ def fetch_feed(url: str, source_name: Optional[str] = None) -> List[Article]:
         except Exception as exc:
             logging.exception("Failed to parse entry from %s: %s", source, exc)
 
+    bozo = str(parsed.bozo_exception) if parsed.bozo else None
+    ttl = _feed_ttl(parsed.feed.get("ttl"))
+    return articles, bozo, time.perf_counter() - started, ttl
+
+
+def _feed_cache() -> Optional[FeedCache]:
+    if config.SNAPSHOT_MODE in ("record", "replay"):
+        # Recording needs full bodies rather than 304s, and a replay should
+        # parse exactly what was recorded
+        return None
+    return FeedCache(config.FEED_CACHE_DIR) if config.FEED_CACHE_DIR else None
+
+
+@dataclass
+class FeedPoll:
+    """
+    Result of one poll of a feed: its articles plus what the server told us
+    about when to come back (response headers and the feed's <ttl>).
+    """
+    url: str
+    articles: List[Article]
+    status: int
+    headers: Dict[str, str]
+    ttl: Optional[int] = None
+    # True when the articles came from the feed cache (304 or same body)
+    cached: bool = False
+    # feedparser's complaint if the body was malformed
+    bozo: Optional[str] = None
+
+
+def fetch_feed(
+    url: str,
+    source_name: Optional[str] = None,
+    timeout: Optional[float] = None,
+    use_cache: bool = True,
+    parse_pool: Optional[Executor] = None,
+) -> List[Article]:
+    """
+    Fetch a single RSS/Atom feed and return a list of Article objects.
+    See poll_feed for the details.
+    """
+    return poll_feed(url, source_name, timeout, use_cache, parse_pool).articles
+
+
+def poll_feed(
+    url: str,
+    source_name: Optional[str] = None,
+    timeout: Optional[float] = None,
+    use_cache: bool = True,
+    parse_pool: Optional[Executor] = None,
+) -> FeedPoll:
+    """
+    Fetch a single RSS/Atom feed and return its articles with the response
+    status, headers and <ttl>, for callers that schedule their next poll.
+
+    Downloading happens in the calling thread; parsing runs in `parse_pool`
+    (e.g. a process pool) when one is given, so CPU-heavy feedparser work can
+    use other cores while this thread goes back to waiting on I/O.
+
+    When the feed cache is enabled, the request is sent as a conditional GET
+    using the stored ETag / Last-Modified, and the cached articles are returned
+    on a 304 or when the body hash matches the last parsed body.
+    """
+    source = source_name or url
+    logging.info("Fetching feed: %s", url)
+
+    cache = _feed_cache() if use_cache else None
+    cached = cache.get(url) if cache else None
+
+    started = time.perf_counter()
+    try:
+        status, body, headers = _download(
+            url,
+            timeout=timeout if timeout is not None else config.FEED_TIMEOUT,
+            request_headers=cached.conditional_headers() if cached else None,
+        )
+    except Exception as exc:
+        metrics.record_feed(url=url, error=repr(exc), seconds=time.perf_counter() - started)
+        raise
+    download_seconds = time.perf_counter() - started
+
+    if cached and status == 304:
+        logging.info(
+            "Feed not modified (304), using %d cached articles from %s",
+            len(cached.articles),
+            source,
+        )
+        metrics.record_feed(
+            url=url,
+            status=status,
+            seconds=download_seconds,
+            bytes=0,
+            entries=len(cached.articles),
+            parse_seconds=0.0,
+            cached=True,
+        )
+        return FeedPoll(
+            url=url,
+            articles=[article_from_dict(a) for a in cached.articles],
+            status=status,
+            headers=headers,
+            ttl=cached.ttl,
+            cached=True,
+        )
+
+    body_hash = hash_body(body)
+    if cached and cached.body_hash == body_hash:
+        logging.info(
+            "Feed body unchanged, using %d cached articles from %s",
+            len(cached.articles),
+            source,
+        )
+        # Server ignored our validators; remember any new ones it sent
+        cached.etag = headers.get("etag") or cached.etag
+        cached.last_modified = headers.get("last-modified") or cached.last_modified
+        cache.put(cached)
+        metrics.record_feed(
+            url=url,
+            status=status,
+            seconds=download_seconds,
+            bytes=len(body),
+            entries=len(cached.articles),
+            parse_seconds=0.0,
+            cached=True,
+        )
+        return FeedPoll(
+            url=url,
+            articles=[article_from_dict(a) for a in cached.articles],
+            status=status,
+            headers=headers,
+            ttl=cached.ttl,
+            cached=True,
+        )
+
+    if parse_pool is not None:
+        future = parse_pool.submit(_parse_body, body, headers, source)
+        articles, bozo, parse_seconds, ttl = future.result()
+    else:
+        articles, bozo, parse_seconds, ttl = _parse_body(body, headers, source)
+
+    if bozo:
+        logging.warning("Feed parse issue for %s: %s", url, bozo)
+
+    metrics.record_feed(
+        url=url,
+        status=status,
+        seconds=download_seconds,
+        bytes=len(body),
+        entries=len(articles),
+        parse_seconds=parse_seconds,
+        bozo=bool(bozo),
+        cached=False,
+    )
+
+    if cache and (articles or not bozo):
+        cache.put(
+            CacheEntry(
+                url=url,
+                etag=headers.get("etag"),
+                last_modified=headers.get("last-modified"),
+                body_hash=body_hash,
+                articles=[article_to_dict(a) for a in articles],
+                ttl=ttl,
+            )
+        )
+
     logging.info("Fetched %d articles from %s", len(articles), source)
-    return articles
+    return FeedPoll(
+        url=url,
+        articles=articles,
+        status=status,
+        headers=headers,
+        ttl=ttl,
+        bozo=bozo,
+    )
 
 
-def fetch_all_feeds(feed_urls: Sequence[str]) -> List[Article]:
+def _fetch_tracked(
+    url: str,
+    timeout: float,
+    parse_pool: Optional[Executor],
+    registry: Optional[HealthRegistry],
+) -> List[Article]:
     """
-    Fetch all feeds and return a combined list of Article objects.
+    fetch_feed, recording the outcome in the feed health registry. A
+    malformed body with no entries at all (e.g. an HTML error page served
+    with 200) counts as a failure.
     """
-    all_articles: List[Article] = []
-    for url in feed_urls:
+    if registry is None:
+        return fetch_feed(url, timeout=timeout, parse_pool=parse_pool)
+
+    started = time.perf_counter()
+    try:
+        poll = poll_feed(url, timeout=timeout, parse_pool=parse_pool)
+    except Exception as exc:
+        registry.record_failure(url, repr(exc))
+        raise
+    if poll.bozo and not poll.articles:
+        registry.record_failure(url, f"no entries: {poll.bozo}")
+        return []
+
+    newest = max((a.published for a in poll.articles if a.published), default=None)
+    registry.record_success(
+        url,
+        time.perf_counter() - started,
+        bozo=bool(poll.bozo),
+        newest_entry=newest,
+    )
+    return poll.articles
+
+
+def _parse_pool(processes: int) -> Optional[ProcessPoolExecutor]:
+    if processes <= 0:
+        return None
+    import multiprocessing
+
+    # spawn, not fork: the pool is used from fetch threads, and forking a
+    # multi-threaded process can deadlock on locks held by other threads
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _iter_feed_results(
+    feed_urls: Sequence[str],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    parse_processes: Optional[int] = None,
+) -> Iterator[Tuple[int, List[Article]]]:
+    """
+    Yield (index into feed_urls, articles) for each feed as soon as it is done.
+
+    With more than one worker, feeds are downloaded concurrently on a bounded
+    thread pool. With parse_processes > 0, the downloaded bodies are parsed on
+    a process pool of that size so parsing uses every core. `timeout` is the
+    per-feed socket timeout and `total_timeout` caps the whole fetch; feeds
+    still outstanding at that point are dropped. Failed feeds are logged and
+    skipped.
+
+    With FEED_HEALTH_PATH set, feeds whose circuit breaker is open are not
+    fetched at all, and every outcome is recorded (see src/health.py).
+    """
+    workers = config.FETCH_WORKERS if max_workers is None else max_workers
+    timeout = config.FEED_TIMEOUT if timeout is None else timeout
+    total_timeout = config.FETCH_TOTAL_TIMEOUT if total_timeout is None else total_timeout
+    processes = config.PARSE_PROCESSES if parse_processes is None else parse_processes
+
+    registry = registry_from_config()
+    if registry is None:
+        active = list(enumerate(feed_urls))
+    else:
+        allowed = set(registry.partition(feed_urls))
+        active = [(i, url) for i, url in enumerate(feed_urls) if url in allowed]
+        for url in feed_urls:
+            if url not in allowed:
+                metrics.record_feed(url=url, skipped=True)
+    if not active:
+        return
+
+    parse_pool = _parse_pool(min(processes, len(active)))
+    try:
+        if workers <= 1 or len(active) <= 1:
+            for i, url in active:
+                try:
+                    yield i, _fetch_tracked(url, timeout, parse_pool, registry)
+                except Exception as exc:
+                    logging.exception("Error fetching feed %s: %s", url, exc)
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(workers, len(active)),
+            thread_name_prefix="feed",
+        )
+        futures = {
+            executor.submit(_fetch_tracked, url, timeout, parse_pool, registry): i
+            for i, url in active
+        }
         try:
-            articles = fetch_feed(url)
-            all_articles.extend(articles)
-        except Exception as exc:
-            logging.exception("Error fetching feed %s: %s", url, exc)
-    return all_articles
+            for future in as_completed(futures, timeout=total_timeout or None):
+                i = futures[future]
+                try:
+                    articles = future.result()
+                except Exception as exc:
+                    logging.error("Error fetching feed %s: %s", feed_urls[i], exc)
+                    continue
+                yield i, articles
+        except FuturesTimeout:
+            for future, i in futures.items():
+                if future.done():
+                    continue
+                # A feed still queued behind slow ones never got its turn;
+                # that says nothing about its health
+                if future.cancel():
+                    logging.warning(
+                        "Skipped feed %s: overall fetch timeout (%.0fs) hit before it started",
+                        feed_urls[i],
+                        total_timeout,
+                    )
+                    continue
+                logging.warning(
+                    "Gave up on feed %s after %.0fs overall fetch timeout",
+                    feed_urls[i],
+                    total_timeout,
+                )
+                # A straggler that finishes later records its outcome on this
+                # registry after save() below, so that outcome is ignored and
+                # this timeout is what persists
+                if registry is not None:
+                    registry.record_failure(feed_urls[i], "overall fetch timeout")
+        finally:
+            # Don't block on stragglers; their socket timeout bounds how long they linger
+            executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+        if registry is not None:
+            registry.save()
+
+
+def fetch_all_feeds(
+    feed_urls: Sequence[str],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    parse_processes: Optional[int] = None,
+) -> List[Article]:
+    """
+    Fetch all feeds and return a combined list of Article objects.
+    Feeds are fetched concurrently (see _iter_feed_results), but articles are
+    always returned in the order of `feed_urls`.
+    """
+    results: List[List[Article]] = [[] for _ in feed_urls]
+    for i, articles in _iter_feed_results(
+        feed_urls, max_workers, timeout, total_timeout, parse_processes
+    ):
+        results[i] = articles
+    return [article for articles in results for article in articles]
+
+
+def iter_all_feeds(
+    feed_urls: Sequence[str],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    parse_processes: Optional[int] = None,
+) -> Iterator[Article]:
+    """
+    Streaming variant of fetch_all_feeds: yield each feed's articles as soon as
+    that feed has been parsed, without holding the combined list in memory.
+    Feed order follows completion order, not `feed_urls`.
+    """
+    for _, articles in _iter_feed_results(
+        feed_urls, max_workers, timeout, total_timeout, parse_processes
+    ):
+        yield from articles
 
 
 if __name__ == "__main__":
@@ -89,8 +566,8 @@ if __name__ == "__main__":
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
 
-    logging.info("Testing fetch_all_feeds with FEED_URLS = %s", FEED_URLS)
-    articles = fetch_all_feeds(FEED_URLS)
+    logging.info("Testing fetch_all_feeds with FEED_URLS = %s", config.FEED_URLS)
+    articles = fetch_all_feeds(config.FEED_URLS)
     logging.info("Total articles fetched: %d", len(articles))
 
     for a in articles[:5]:
@@ -2,45 +2,218 @@
 from __future__ import annotations
 
 import logging
-from typing import Sequence
-
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
 from . import config
 
+if TYPE_CHECKING:
+    from sendgrid import SendGridAPIClient
+
+# SendGrid accepts at most 1000 personalizations (one per recipient with
+# is_multiple=True) in a single /v3/mail/send request
+MAX_PERSONALIZATIONS = 1000
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of delivering one batch of recipients.
+    """
+    index: int
+    recipients: List[str]
+    status_code: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    retry_delays: List[float] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+
+def _is_retryable(status_code: Optional[int], error: Optional[BaseException] = None) -> bool:
+    """
+    429 and 5xx are safe to retry: SendGrid did not accept the batch. With no
+    response at all, only retry when the request never reached SendGrid
+    (urllib raises URLError for failures while connecting / sending). A read
+    timeout or dropped connection after sending may follow an accepted
+    batch, and retrying would email every recipient in it twice.
+    """
+    from urllib.error import URLError
+
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, URLError)
+
+
+def _retry_delay(attempt: int, base: float, retry_after: Optional[str] = None) -> float:
+    """
+    Exponential backoff with full jitter; a numeric Retry-After wins if larger.
+    """
+    delay = random.uniform(0, base * (2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def _chunk(recipients: Sequence[str], size: int) -> List[List[str]]:
+    return [list(recipients[i:i + size]) for i in range(0, len(recipients), size)]
+
+
+def _send_batch(
+    client: SendGridAPIClient,
+    index: int,
+    recipients: List[str],
+    subject: str,
+    html_body: str,
+    text_body: str,
+    max_retries: int,
+    backoff: float,
+) -> BatchResult:
+    from python_http_client.exceptions import HTTPError
+    from sendgrid.helpers.mail import Mail
+
+    result = BatchResult(index=index, recipients=recipients)
+    message = Mail(
+        from_email=config.FROM_EMAIL,
+        to_emails=recipients,
+        subject=subject,
+        html_content=html_body,
+        plain_text_content=text_body,
+        is_multiple=True,
+    ).get()
+
+    for attempt in range(max_retries + 1):
+        result.attempts = attempt + 1
+        retry_after = None
+        error: Optional[BaseException] = None
+        try:
+            response = client.send(message)
+            result.status_code = response.status_code
+            result.error = None
+            if response.status_code != 202:
+                logging.warning(
+                    "Unexpected SendGrid status code for batch %d: %s",
+                    index,
+                    response.status_code,
+                )
+            return result
+        except HTTPError as exc:
+            result.status_code = exc.status_code
+            result.error = f"HTTP {exc.status_code}: {exc.reason}"
+            retry_after = (exc.headers or {}).get("Retry-After")
+        except Exception as exc:
+            result.status_code = None
+            result.error = repr(exc)
+            error = exc
+
+        if attempt == max_retries or not _is_retryable(result.status_code, error):
+            break
+
+        delay = _retry_delay(attempt, backoff, retry_after)
+        result.retry_delays.append(delay)
+        logging.warning(
+            "SendGrid batch %d failed (%s); retry %d/%d in %.1fs",
+            index,
+            result.error,
+            attempt + 1,
+            max_retries,
+            delay,
+        )
+        time.sleep(delay)
+
+    logging.error(
+        "SendGrid batch %d (%d recipients) failed after %d attempt(s): %s",
+        index,
+        len(recipients),
+        result.attempts,
+        result.error,
+    )
+    return result
+
 
 def send_newsletter(
     recipients: Sequence[str],
     subject: str,
     html_body: str,
     text_body: str,
-) -> None:
+    batch_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    max_retries: Optional[int] = None,
+) -> List[BatchResult]:
     """
     Send the newsletter email to the given recipients via SendGrid.
+
+    Recipients are split into batches of at most `batch_size` personalizations,
+    sent concurrently over one shared client. 429 and 5xx responses, and
+    connection failures before the request reached SendGrid, are retried
+    with exponential backoff and jitter; timeouts after sending are not
+    (see _is_retryable).
+    Returns one BatchResult per batch; raises RuntimeError if any batch still
+    failed, after every batch has been attempted.
     """
     if not config.SENDGRID_API_KEY:
         raise RuntimeError("SENDGRID_API_KEY is not set in environment/config")
 
     if not recipients:
         logging.warning("No recipients configured; skipping email send.")
-        return
+        return []
 
-    message = Mail(
-        from_email=config.FROM_EMAIL,
-        to_emails=list(recipients),
-        subject=subject,
-        html_content=html_body,
-        plain_text_content=text_body,
-        is_multiple=True,
+    batch_size = min(batch_size or config.SENDGRID_BATCH_SIZE, MAX_PERSONALIZATIONS)
+    max_workers = max_workers or config.SENDGRID_WORKERS
+    max_retries = config.SENDGRID_MAX_RETRIES if max_retries is None else max_retries
+
+    # sendgrid is slow to import; only pay for it when actually sending
+    from sendgrid import SendGridAPIClient
+
+    client = SendGridAPIClient(config.SENDGRID_API_KEY, host=config.SENDGRID_HOST)
+    client.client.timeout = config.SENDGRID_TIMEOUT
+
+    batches = _chunk(list(recipients), batch_size)
+    logging.info(
+        "Sending to %d recipients in %d batch(es) of up to %d",
+        len(recipients),
+        len(batches),
+        batch_size,
     )
 
-    try:
-        sg = SendGridAPIClient(config.SENDGRID_API_KEY)
-        response = sg.send(message)
-        logging.info("SendGrid response status: %s", response.status_code)
-        if response.status_code != 202:
-            logging.warning("Unexpected SendGrid status code: %s", response.status_code)
-    except Exception as exc:
-        logging.exception("Error sending newsletter via SendGrid: %s", exc)
-        raise
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        results = list(
+            executor.map(
+                lambda item: _send_batch(
+                    client,
+                    item[0],
+                    item[1],
+                    subject,
+                    html_body,
+                    text_body,
+                    max_retries,
+                    config.SENDGRID_BACKOFF,
+                ),
+                enumerate(batches),
+            )
+        )
+
+    for result in results:
+        logging.info(
+            "SendGrid batch %d: %d recipients, status %s, %d attempt(s)",
+            result.index,
+            len(result.recipients),
+            result.status_code,
+            result.attempts,
+        )
+
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(results)} SendGrid batches failed: "
+            + "; ".join(f"batch {r.index}: {r.error}" for r in failed)
+        )
+    return results
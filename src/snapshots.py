@@ -0,0 +1,151 @@
+# src/snapshots.py
+"""
+Record/replay of raw feed responses.
+
+With SNAPSHOT_MODE=record every feed response (status, headers, body) is saved
+under SNAPSHOT_DIR; with SNAPSHOT_MODE=replay the scraper is served from a
+saved snapshot instead of the network, so a day's run can be reproduced
+offline and filter/render benchmarks can use real inputs.
+
+Layout:
+
+    objects/ab/<sha256>.gz      gzip-compressed body, addressed by its hash,
+                                so a body that doesn't change day to day is
+                                stored once
+    manifests/<name>.json       url -> {status, headers, body: sha256}
+
+A snapshot's name defaults to the UTC date (SNAPSHOT_NAME overrides it).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+
+
+class SnapshotMissError(LookupError):
+    """
+    Replay was asked for a URL the snapshot doesn't contain.
+    """
+
+
+def default_snapshot_name() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class SnapshotStore:
+    def __init__(self, directory: str | Path, name: Optional[str] = None):
+        self.directory = Path(directory)
+        self.name = name or default_snapshot_name()
+        self.manifest_path = self.directory / "manifests" / f"{self.name}.json"
+        self._lock = threading.Lock()
+        self._manifest: Optional[Dict[str, Dict]] = None
+
+    @property
+    def manifest(self) -> Dict[str, Dict]:
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = {}
+        return self._manifest
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.gz"
+
+    def put_body(self, body: bytes) -> str:
+        """
+        Store a body (once) and return its sha256.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            # mtime=0 keeps the object bytes a pure function of the body
+            with gzip.GzipFile(tmp_path, "wb", compresslevel=9, mtime=0) as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        with gzip.open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def record(self, url: str, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        """
+        Add a response to this snapshot. A 304 has no body worth keeping, so
+        it only records the status if the URL isn't already in the snapshot.
+        """
+        digest = self.put_body(body) if status != 304 else None
+        with self._lock:
+            if digest is None and url in self.manifest:
+                return
+            self.manifest[url] = {"status": status, "headers": headers, "body": digest}
+            self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def replay(self, url: str) -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        The recorded (status, body, headers) for `url`, like scraper._download.
+        """
+        entry = self.manifest.get(url)
+        if entry is None:
+            raise SnapshotMissError(f"{url} is not in snapshot {self.name}")
+        body = self.get_body(entry["body"]) if entry.get("body") else b""
+        return entry["status"], body, dict(entry.get("headers") or {})
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self.manifest))
+
+
+_active: Optional[SnapshotStore] = None
+_active_lock = threading.Lock()
+
+
+def active_store() -> Optional[SnapshotStore]:
+    """
+    The store for SNAPSHOT_MODE (shared by all fetch threads), or None when
+    snapshots are off.
+    """
+    global _active
+    from . import config
+
+    if config.SNAPSHOT_MODE not in ("record", "replay"):
+        if config.SNAPSHOT_MODE:
+            logging.warning("Ignoring unknown SNAPSHOT_MODE %r", config.SNAPSHOT_MODE)
+        return None
+    with _active_lock:
+        if _active is None:
+            _active = SnapshotStore(config.SNAPSHOT_DIR, config.SNAPSHOT_NAME or None)
+            logging.info("Snapshot %s: %s under %s", config.SNAPSHOT_MODE, _active.name, _active.directory)
+        return _active
+
+
+if __name__ == "__main__":
+    # List snapshots: `python -m src.snapshots [name]`
+    import sys
+
+    from . import config
+
+    if len(sys.argv) > 1:
+        store = SnapshotStore(config.SNAPSHOT_DIR, sys.argv[1])
+        for url in store:
+            entry = store.manifest[url]
+            print(f"{entry['status']}  {(entry.get('body') or '-')[:12]}  {url}")
+    else:
+        for path in sorted((Path(config.SNAPSHOT_DIR) / "manifests").glob("*.json")):
+            print(path.stem)
@@ -0,0 +1,181 @@
+# src/store.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set
+import json
+import logging
+import re
+import sqlite3
+
+from .scraper import Article, article_from_dict, article_to_dict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL,
+    title_key TEXT,
+    source TEXT NOT NULL,
+    published TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    sent_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS articles_link ON articles(link) WHERE link <> '';
+CREATE UNIQUE INDEX IF NOT EXISTS articles_title_key ON articles(title_key);
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published);
+"""
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> Optional[str]:
+    """
+    Key used to spot the same headline across feeds: lower-case, punctuation
+    dropped, whitespace collapsed. Empty / placeholder titles give None so they
+    never collide with each other.
+    """
+    key = " ".join(_NON_WORD.sub(" ", title.lower()).split())
+    if not key or key == "no title":
+        return None
+    return key
+
+
+class ArticleStore:
+    """
+    Persistent SQLite store of every article we've ingested.
+    Unique indexes on link and normalized title make ingest an upsert:
+    known articles only get their last_seen bumped. Articles count as seen
+    once mark_sent() records them as delivered, so a failed send or a re-run
+    offers the same articles again.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        # Rows already returned by add() in this session, so duplicates within
+        # one batch are still dropped while nothing is marked sent yet
+        self._claimed: Set[int] = set()
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        if "sent_at" not in columns:
+            # Older stores marked everything seen on ingest; keep treating
+            # those rows as sent
+            with self._conn:
+                self._conn.execute("ALTER TABLE articles ADD COLUMN sent_at TEXT")
+                self._conn.execute("UPDATE articles SET sent_at = first_seen")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ArticleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, article: Article, seen_at: Optional[datetime] = None) -> bool:
+        """
+        Insert one article. Returns True unless it was already sent (or already
+        returned earlier in this session). Call commit() (or use ingest) to persist.
+        """
+        now = (seen_at or datetime.now(timezone.utc)).isoformat()
+        title_key = normalize_title(article.title)
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO articles "
+            "(link, title_key, source, published, first_seen, last_seen, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                article.link,
+                title_key,
+                article.source,
+                article.published.isoformat() if article.published else None,
+                now,
+                now,
+                json.dumps(article_to_dict(article)),
+            ),
+        )
+        if cursor.rowcount == 1:
+            self._claimed.add(cursor.lastrowid)
+            return True
+
+        self._conn.execute(
+            "UPDATE articles SET last_seen = ? "
+            "WHERE (link = ? AND link <> '') OR title_key = ?",
+            (now, article.link, title_key),
+        )
+        rows = self._conn.execute(
+            "SELECT id, sent_at FROM articles WHERE (link = ? AND link <> '') OR title_key = ?",
+            (article.link, title_key),
+        ).fetchall()
+        if any(sent_at is not None or row_id in self._claimed for row_id, sent_at in rows):
+            return False
+        self._claimed.update(row_id for row_id, _ in rows)
+        return True
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def ingest(self, articles: Iterable[Article]) -> List[Article]:
+        """
+        Upsert a batch of articles in one transaction and return only the ones
+        not sent before (dropping duplicates within the batch itself).
+        """
+        seen_at = datetime.now(timezone.utc)
+        new_articles: List[Article] = []
+        total = 0
+        with self._conn:
+            for article in articles:
+                total += 1
+                if self.add(article, seen_at=seen_at):
+                    new_articles.append(article)
+        logging.info("Article store: %d unsent of %d ingested", len(new_articles), total)
+        return new_articles
+
+    def mark_sent(self, articles: Iterable[Article], sent_at: Optional[datetime] = None) -> int:
+        """
+        Record articles as delivered, so later runs skip them. Returns how
+        many stored rows were newly marked.
+        """
+        now = (sent_at or datetime.now(timezone.utc)).isoformat()
+        marked = 0
+        with self._conn:
+            for article in articles:
+                cursor = self._conn.execute(
+                    "UPDATE articles SET sent_at = ? "
+                    "WHERE ((link = ? AND link <> '') OR title_key = ?) AND sent_at IS NULL",
+                    (now, article.link, normalize_title(article.title)),
+                )
+                marked += cursor.rowcount
+        return marked
+
+    def articles_since(self, since: datetime) -> Iterator[Article]:
+        """
+        Stored articles sent at or after `since`, oldest first.
+        """
+        rows = self._conn.execute(
+            "SELECT data FROM articles WHERE sent_at >= ? ORDER BY sent_at",
+            (since.isoformat(),),
+        )
+        for (data,) in rows:
+            yield article_from_dict(json.loads(data))
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+if __name__ == "__main__":
+    # Manual check: run `python -m src.store` from project root
+    from .config import ARTICLE_DB
+
+    if not ARTICLE_DB:
+        print("ARTICLE_DB is not set; nothing to inspect.")
+    else:
+        with ArticleStore(ARTICLE_DB) as store:
+            print(f"{ARTICLE_DB}: {store.count()} articles stored")
@@ -0,0 +1,58 @@
+# src/text.py
+from __future__ import annotations
+
+from html import unescape
+from typing import Optional
+import re
+
+# One alternation, one pass: a run of whitespace / tags / comments / nbsp
+# collapses to a single space; any other entity is unescaped in place.
+_HTML_TOKEN = re.compile(
+    r"(?P<space>(?:\s|&nbsp;|&#160;|&#xa0;|<!--.*?-->"
+    r"|<(?:script|style)\b.*?</(?:script|style)\s*>|<[^>]*>)+)"
+    r"|(?P<entity>&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);)",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# Plain text each JSON Feed / RSS item carries; Article.text itself is kept
+# whole so the filter sees all of it, and the email cards truncate further
+MAX_TEXT_CHARS = 600
+
+
+def _replace(match: re.Match) -> str:
+    if match.lastgroup == "entity":
+        return unescape(match.group(0))
+    return " "
+
+
+def html_to_text(raw: str) -> str:
+    """
+    Turn an HTML feed summary into clean plain text: strip tags (and script /
+    style bodies), unescape entities and collapse whitespace, in a single
+    regex pass.
+    """
+    if not raw:
+        return ""
+    return _HTML_TOKEN.sub(_replace, raw).strip()
+
+
+def truncate_words(text: str, limit: int, suffix: str = "...") -> str:
+    """
+    Cut `text` to at most `limit` characters (plus suffix) on a word boundary.
+    """
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:-") + suffix
+
+
+def summary_text(raw: str, limit: Optional[int] = None) -> str:
+    """
+    Normalized plain text for a raw summary, capped at `limit` characters
+    (on a word boundary) when one is given.
+    """
+    text = html_to_text(raw)
+    return truncate_words(text, limit) if limit else text
@@ -0,0 +1,146 @@
+# src/timeindex.py
+"""
+Publish-time windows for the brief ("last 24h", "since the previous issue").
+
+TimeIndex keeps articles ordered by UTC timestamp so a window is two bisects
+and a slice: O(log n + k) for k articles in the window, with no re-sort when
+articles are added one at a time (the daemon) or the index is queried
+repeatedly.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+import logging
+import re
+
+from .scraper import Article
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([mhd])\s*$", re.IGNORECASE)
+_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+LAST_ISSUE = "last-issue"
+
+
+def as_utc(dt: datetime) -> datetime:
+    """
+    Aware UTC datetime; naive values are taken to be UTC already.
+    """
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class TimeIndex:
+    """
+    Dated articles sorted by publish time. Undated articles are skipped, as
+    they can't be placed in any window.
+    """
+
+    def __init__(self, articles: Iterable[Article] = ()):
+        # Stable sort on the timestamp alone, so ties keep arrival order
+        pairs = sorted(
+            ((as_utc(a.published).timestamp(), a) for a in articles if a.published),
+            key=lambda p: p[0],
+        )
+        self._keys: List[float] = [p[0] for p in pairs]
+        self._articles: List[Article] = [p[1] for p in pairs]
+
+    def add(self, article: Article) -> None:
+        if article.published is None:
+            return
+        key = as_utc(article.published).timestamp()
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._articles.insert(i, article)
+
+    def window(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Article]:
+        """
+        Articles published in [since, until), newest first.
+        """
+        lo = bisect_left(self._keys, as_utc(since).timestamp()) if since else 0
+        hi = bisect_left(self._keys, as_utc(until).timestamp()) if until else len(self._keys)
+        return self._articles[lo:hi][::-1]
+
+    def drop_before(self, cutoff: datetime) -> int:
+        """
+        Forget articles published before `cutoff`; returns how many.
+        """
+        i = bisect_left(self._keys, as_utc(cutoff).timestamp())
+        del self._keys[:i]
+        del self._articles[:i]
+        return i
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Article]:
+        return iter(self._articles)
+
+
+def in_window(
+    articles: Iterable[Article],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[Article]:
+    """
+    Streaming window filter for a one-shot pass, where building an index
+    would cost a sort of its own. Undated articles are dropped.
+    """
+    since = as_utc(since) if since else None
+    until = as_utc(until) if until else None
+    for article in articles:
+        if article.published is None:
+            continue
+        published = as_utc(article.published)
+        if (since is None or published >= since) and (until is None or published < until):
+            yield article
+
+
+def read_last_issue(path: str | Path) -> Optional[datetime]:
+    try:
+        return as_utc(datetime.fromisoformat(Path(path).read_text(encoding="utf-8").strip()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logging.warning("Ignoring unreadable last-issue marker %s: %s", path, exc)
+        return None
+
+
+def mark_issue(path: str | Path, at: Optional[datetime] = None) -> None:
+    """
+    Remember when an issue went out, for TIME_WINDOW=last-issue.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text((at or datetime.now(timezone.utc)).isoformat(), encoding="utf-8")
+
+
+def window_start(
+    spec: str,
+    now: Optional[datetime] = None,
+    last_issue_path: Optional[str | Path] = None,
+) -> Optional[datetime]:
+    """
+    Start of the TIME_WINDOW: a duration like "24h", "90m" or "2d" before
+    `now`, or "last-issue" for the time the previous issue went out (no
+    window on the first run). Empty means no window.
+    """
+    spec = (spec or "").strip().lower()
+    if not spec:
+        return None
+    now = as_utc(now or datetime.now(timezone.utc))
+
+    if spec == LAST_ISSUE:
+        last = read_last_issue(last_issue_path) if last_issue_path else None
+        if last is None:
+            logging.info("No previous issue recorded; not applying a time window")
+        return last
+
+    match = _DURATION.match(spec)
+    if not match:
+        raise ValueError(f"Unknown TIME_WINDOW {spec!r}; expected e.g. '24h', '2d' or '{LAST_ISSUE}'")
+    amount, unit = float(match.group(1)), match.group(2).lower()
+    return now - timedelta(**{_UNITS[unit]: amount})
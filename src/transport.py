@@ -0,0 +1,317 @@
+# src/transport.py
+"""
+Shared HTTP transport for feed downloads.
+
+- Keep-alive connections pooled per (scheme, host, port), so feeds on the
+  same publisher host reuse one TCP/TLS handshake across the run (and across
+  polls in the daemon).
+- Compressed transfer: asks for gzip/deflate (and br when the brotli package
+  is installed) and decodes incrementally as chunks arrive.
+- A cap on the decoded body size (FEED_MAX_BYTES), enforced while reading, so
+  an oversized or decompression-bomb response is cut off early.
+- Redirects are followed (up to MAX_REDIRECTS) on the pooled connections.
+
+Only http.client from the standard library is used; proxies configured via
+environment variables are not applied.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+import http.client
+import logging
+import ssl
+import threading
+import zlib
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # optional
+    brotli = None
+
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 4
+_REDIRECTS = {301, 302, 303, 307, 308}
+
+
+class HTTPError(Exception):
+    """
+    Non-success HTTP status. `headers` are lower-cased, so callers can read
+    e.g. retry-after.
+    """
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str]):
+        super().__init__(f"HTTP Error {status}: {reason}")
+        self.url = url
+        self.status = status
+        self.code = status
+        self.reason = reason
+        self.headers = headers
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+def accept_encoding() -> str:
+    return "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class _Decoder:
+    """
+    Incremental Content-Encoding decoder that never produces more than the
+    caller's remaining budget in one step.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding in ("gzip", "x-gzip"):
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            # Servers send either zlib-wrapped or raw deflate; sniffed on first chunk
+            self._zlib = None
+        elif encoding == "br" and brotli is not None:
+            self._brotli = brotli.Decompressor()
+        elif encoding in ("", "identity"):
+            pass
+        else:
+            raise ValueError(f"Unsupported Content-Encoding {encoding!r}")
+
+    def feed(self, data: bytes, limit: int) -> bytes:
+        """
+        Decode `data`; raises ResponseTooLarge past `limit` decoded bytes.
+        """
+        if self.encoding in ("", "identity"):
+            out = data
+        elif self.encoding == "br":
+            out = self._brotli.process(data)
+        else:
+            if self._zlib is None:
+                raw = not data or (data[0] & 0x0F) != 8
+                self._zlib = zlib.decompressobj(-zlib.MAX_WBITS if raw else zlib.MAX_WBITS)
+            out = self._zlib.decompress(data, limit + 1)
+            if self._zlib.unconsumed_tail:
+                raise ResponseTooLarge(f"decoded body exceeds {limit} bytes")
+        if len(out) > limit:
+            raise ResponseTooLarge(f"decoded body exceeds {limit} bytes")
+        return out
+
+    def flush(self) -> bytes:
+        if self.encoding not in ("", "identity", "br") and self._zlib is not None:
+            return self._zlib.flush()
+        return b""
+
+
+class Transport:
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        # Handshakes saved, for logging / metrics
+        self.reused = 0
+        self.opened = 0
+
+    def _new_connection(self, key: Tuple[str, str, int], timeout: Optional[float]) -> http.client.HTTPConnection:
+        with self._lock:
+            self.opened += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _connection(self, key: Tuple[str, str, int], timeout: Optional[float]) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        An idle pooled connection for `key` (reused=True) or a new one.
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_connection(key, timeout), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _request(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        timeout: Optional[float],
+    ) -> Tuple[Tuple[str, str, int], http.client.HTTPConnection, http.client.HTTPResponse]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL {url!r}")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        conn, reused = self._connection(key, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            return key, conn, conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            conn.close()
+            raise
+
+        # The server closed an idle keep-alive connection; retry once on a new one
+        conn = self._new_connection(key, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            return key, conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        max_bytes: int = 10 * 1024 * 1024,
+    ) -> Tuple[int, bytes, Dict[str, str], str]:
+        """
+        GET `url`, returning (status, decoded body, lower-cased headers, final
+        URL). 304 comes back with an empty body; other statuses >= 400 raise
+        HTTPError. The timeout applies to the connect and to each read.
+        """
+        request_headers = {"Accept-Encoding": accept_encoding(), "Connection": "keep-alive"}
+        request_headers.update(headers or {})
+
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, response = self._request(url, request_headers, timeout)
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            status = response.status
+
+            if status in _REDIRECTS and "location" in response_headers:
+                self._drain(key, conn, response)
+                url = urljoin(url, response_headers["location"])
+                continue
+
+            if status == 304 or status >= 400:
+                self._drain(key, conn, response)
+                if status >= 400:
+                    raise HTTPError(url, status, response.reason, response_headers)
+                return status, b"", response_headers, url
+
+            body = self._read_body(key, conn, response, response_headers, max_bytes)
+            # The body is decoded now; stop feedparser from decoding it again
+            response_headers.pop("content-encoding", None)
+            response_headers["content-length"] = str(len(body))
+            return status, body, response_headers, url
+
+        raise HTTPError(url, 310, f"more than {MAX_REDIRECTS} redirects", {})
+
+    def _read_body(
+        self,
+        key: Tuple[str, str, int],
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        headers: Dict[str, str],
+        max_bytes: int,
+    ) -> bytes:
+        declared = headers.get("content-length")
+        encoding = headers.get("content-encoding", "").strip().lower()
+        try:
+            decoder = _Decoder(encoding)
+            if declared and declared.isdigit() and not encoding and int(declared) > max_bytes:
+                raise ResponseTooLarge(f"Content-Length {declared} exceeds {max_bytes} bytes")
+
+            parts: List[bytes] = []
+            size = 0
+            while True:
+                chunk = response.read1(CHUNK_SIZE)
+                if not chunk:
+                    break
+                out = decoder.feed(chunk, max_bytes - size)
+                size += len(out)
+                parts.append(out)
+            tail = decoder.flush()
+            if size + len(tail) > max_bytes:
+                raise ResponseTooLarge(f"decoded body exceeds {max_bytes} bytes")
+            parts.append(tail)
+        except BaseException:
+            # Unread bytes left on the socket make it unusable
+            conn.close()
+            raise
+
+        # read1 doesn't mark a Content-Length body finished; the connection
+        # only accepts a new request once the response is closed
+        response.close()
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return b"".join(parts)
+
+    def _drain(
+        self,
+        key: Tuple[str, str, int],
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        limit: int = 64 * 1024,
+    ) -> None:
+        """
+        Discard a small body (redirect / error page) so the connection can be
+        reused; close it instead if the body is large.
+        """
+        try:
+            data = response.read(limit + 1)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            return
+        response.close()
+        if len(data) > limit or response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+
+_shared: Optional[Transport] = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport() -> Transport:
+    """
+    The process-wide transport used by the scraper.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Transport()
+        return _shared
+
+
+def close_shared() -> None:
+    global _shared
+    with _shared_lock:
+        transport, _shared = _shared, None
+    if transport is not None:
+        logging.info(
+            "HTTP transport: %d connections opened, %d reused", transport.opened, transport.reused
+        )
+        transport.close()
@@ -0,0 +1,65 @@
+# tests/test_artifacts.py
+from __future__ import annotations
+
+from src import artifacts, config, filter as filter_module, formats
+from src.editions import Edition
+from src.optimize import render_email
+from src.scraper import Article
+from src.store import ArticleStore
+
+
+def _articles():
+    return [
+        Article(
+            title=f"Fed signals rate path {n}",
+            link=f"https://news.example/{n}",
+            source="https://news.example/rss",
+            published=None,
+            summary="Inflation and the Fed.",
+        )
+        for n in range(3)
+    ]
+
+
+def test_store_runs_never_reuse_a_filter_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACT_DIR", str(tmp_path / "artifacts"), raising=False)
+    monkeypatch.setattr(config, "TIME_WINDOW", "", raising=False)
+    monkeypatch.setattr(config, "NEAR_DUPLICATE_THRESHOLD", 0.0, raising=False)
+    calls = []
+    select_editions = filter_module.select_editions
+
+    def counting_select(*args, **kwargs):
+        calls.append(kwargs.get("store"))
+        return select_editions(*args, **kwargs)
+
+    monkeypatch.setattr(filter_module, "select_editions", counting_select)
+    editions = [Edition(name="default", subject="Brief", recipients=[], keywords=["fed"], max_articles=10)]
+
+    # Without a store, the second identical run is served from the cache
+    artifacts.cached_selections(_articles(), editions)
+    artifacts.cached_selections(_articles(), editions)
+    assert len(calls) == 1
+
+    with ArticleStore(tmp_path / "articles.sqlite3") as store:
+        first = artifacts.cached_selections(_articles(), editions, store=store)
+        store.mark_sent(first[0])
+        second = artifacts.cached_selections(_articles(), editions, store=store)
+    assert len(calls) == 3
+    assert len(first[0]) == 3
+    assert second == [[]]
+
+
+def test_render_artifact_is_streamed_to_files_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACT_DIR", str(tmp_path / "artifacts"), raising=False)
+    monkeypatch.setattr(config, "SITE_URL", "https://brief.example/", raising=False)
+    articles = _articles()
+
+    first = artifacts.cached_render("Brief", articles)
+    html, text = render_email("Brief", articles)
+    assert first.html.read_text(encoding="utf-8") == html
+    assert first.text.read_text(encoding="utf-8") == text
+    assert first.kept == 3 and first.rss is not None
+
+    # A second process gets the same files back without rendering
+    monkeypatch.setattr(formats, "render_formats", None)
+    assert artifacts.cached_render("Brief", articles) == first
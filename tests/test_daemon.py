@@ -0,0 +1,35 @@
+# tests/test_daemon.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import gzip
+
+from src import config
+from src.daemon import PollingDaemon
+from src.scraper import Article
+
+
+def test_rebuild_writes_the_email_and_the_web_view_like_the_page_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TIME_WINDOW", "", raising=False)
+    monkeypatch.setattr(config, "PRECOMPRESS_PAGES", True, raising=False)
+    preview, index = tmp_path / "preview.html", tmp_path / "index.html"
+    daemon = PollingDaemon([], html_paths=[preview], text_path=tmp_path / "brief.txt", page_paths=[index])
+    now = datetime.now(timezone.utc)
+    for n in range(3):
+        daemon.index.add(
+            Article(
+                title=f"Fed decision {n} lifts markets",
+                link=f"https://news.example/{n}",
+                source="https://news.example/rss",
+                published=now - timedelta(hours=n),
+                summary=f"Inflation and rates, part {n}.",
+            )
+        )
+
+    daemon.rebuild()
+
+    page = index.read_text(encoding="utf-8")
+    # The web view moves repeated inline styles into classes; the email keeps them inline
+    assert "<style>" in page and "<style>" not in preview.read_text(encoding="utf-8")
+    assert gzip.decompress((tmp_path / "index.html.gz").read_bytes()).decode("utf-8") == page
+    assert "Fed decision 0" in (tmp_path / "brief.txt").read_text(encoding="utf-8")
@@ -0,0 +1,28 @@
+# tests/test_fastparse.py
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.corpus import generate_entries, to_atom, to_rss
+from benchmarks.parity import EDGE_CASES, _fast_records, _feedparser_records
+from src.fastparse import UnsupportedFeed
+
+
+@pytest.mark.parametrize(
+    "body, headers",
+    [pytest.param(body.encode("utf-8"), headers, id=name) for name, body, headers in EDGE_CASES],
+)
+def test_edge_cases_match_feedparser_or_fall_back(body, headers):
+    expected = _feedparser_records(body, headers)
+    try:
+        actual = _fast_records(body, headers)
+    except UnsupportedFeed:
+        # Handing the feed to feedparser is the right outcome for the odd ones
+        return
+    assert actual == expected
+
+
+@pytest.mark.parametrize("render", [to_rss, to_atom], ids=["rss", "atom"])
+def test_well_formed_feeds_take_the_fast_path(render):
+    body = render(generate_entries(200))
+    assert _fast_records(body, {}) == _feedparser_records(body, {})
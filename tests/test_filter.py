@@ -0,0 +1,66 @@
+# tests/test_filter.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from src import config
+from src.editions import Edition
+from src.email_builder import _render_fragments
+from src.filter import iter_relevant, select_editions
+from src.scraper import Article
+from src.timeindex import TimeIndex
+
+
+def _articles():
+    now = datetime.now(timezone.utc)
+    ages = [1, 50, None, 3, 30, 12]
+    return [
+        Article(
+            title=f"Fed story number {n}",
+            link=f"https://news.example/{n}",
+            source=f"feed{n % 2}",
+            published=now - timedelta(hours=age) if age is not None else None,
+            summary=f"Inflation update {n}.",
+        )
+        for n, age in enumerate(ages)
+    ]
+
+
+def _links(selections):
+    return [[a.link for a in selected] for selected in selections]
+
+
+def _configure(monkeypatch, window):
+    monkeypatch.setattr(config, "TIME_WINDOW", window, raising=False)
+    monkeypatch.setattr(config, "NEAR_DUPLICATE_THRESHOLD", 0.0, raising=False)
+    monkeypatch.setattr(config, "RANKING", "recency", raising=False)
+    return [Edition(name="brief", keywords=["fed"], max_articles=10)]
+
+
+def test_indexed_window_selects_the_same_articles_as_a_scan(monkeypatch):
+    editions = _configure(monkeypatch, "24h")
+    expected = ["https://news.example/0", "https://news.example/3", "https://news.example/5"]
+    # The daemon's long-lived index, and the one-pass scan of a fetched list
+    assert _links(select_editions(TimeIndex(_articles()), editions)) == [expected]
+    assert _links(select_editions(_articles(), editions)) == [expected]
+
+
+def test_no_window_keeps_undated_articles(monkeypatch):
+    editions = _configure(monkeypatch, "")
+    assert "https://news.example/2" in _links(select_editions(_articles(), editions))[0]
+
+
+def test_keywords_late_in_a_long_summary_still_match():
+    summary = "<p>" + "Markets were quiet for most of the session. " * 20 + "Then the Fed spoke.</p>"
+    article = Article(
+        title="Afternoon wrap",
+        link="https://news.example/long",
+        source="a",
+        published=None,
+        summary=summary,
+    )
+    assert article.text.index("Fed") > 600
+
+    assert [a.keywords for a in iter_relevant([article], ["fed"])] == [["fed"]]
+    # Display still truncates
+    assert "Fed" not in _render_fragments(article)[0]
@@ -0,0 +1,77 @@
+# tests/test_formats.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+import json
+
+import pytest
+
+from src import config
+from src.email_builder import build_html_email, build_text_email
+from src.formats import render_formats
+from src.optimize import extract_styles, fit_email, minify_html, render_email, render_web
+from src.scraper import Article
+
+
+def _articles(count: int = 6):
+    return [
+        Article(
+            title=f"Fed & markets story {n}",
+            link=f"https://news.example/{n}?a=1&b=2",
+            source="https://news.example/rss",
+            published=datetime(2026, 1, 2, n, tzinfo=timezone.utc) if n % 2 else None,
+            summary=f"<p>Inflation update {n}: the <b>Fed</b> and CPI.</p>",
+            keywords=["fed", "cpi"],
+            related_sources=["other.example"] if n == 1 else [],
+        )
+        for n in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count", [0, 1, 6])
+def test_streamed_bodies_match_the_page_builders(count):
+    articles = _articles(count)
+    html, text = render_email("Brief", articles)
+    assert html == minify_html(build_html_email("Brief", articles))
+    assert text == build_text_email("Brief", articles)
+    assert render_web("Brief", articles) == extract_styles(minify_html(build_html_email("Brief", articles)))
+
+
+def test_budget_keeps_the_largest_prefix_that_fits():
+    articles = _articles()
+    full = minify_html(build_html_email("Brief", articles[:3]))
+    html, kept = fit_email("Brief", articles, budget=len(full.encode("utf-8")))
+    assert kept == articles[:3]
+    assert html == full
+    assert render_email("Brief", kept)[1] == build_text_email("Brief", kept)
+
+
+def test_feeds(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SITE_URL", "https://brief.example/", raising=False)
+    render_formats("Brief", _articles(), json_feed=tmp_path / "feed.json", rss=tmp_path / "feed.xml")
+
+    feed = json.loads((tmp_path / "feed.json").read_text(encoding="utf-8"))
+    assert feed["feed_url"] == "https://brief.example/feed.json"
+    assert [item["id"] for item in feed["items"]] == [a.link for a in _articles()]
+
+    channel = ElementTree.parse(tmp_path / "feed.xml").getroot().find("channel")
+    assert channel.findtext("link") == "https://brief.example/"
+    assert len(channel.findall("item")) == 6
+
+    # Nothing changed, so nothing is rewritten
+    written = (tmp_path / "feed.json").stat().st_mtime_ns
+    render_formats("Brief", _articles(), json_feed=tmp_path / "feed.json")
+    assert (tmp_path / "feed.json").stat().st_mtime_ns == written
+
+
+def test_rss_needs_a_site_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SITE_URL", "", raising=False)
+    render_formats("Brief", _articles(), text=tmp_path / "brief.txt", rss=tmp_path / "feed.xml")
+    assert (tmp_path / "brief.txt").exists()
+    assert not (tmp_path / "feed.xml").exists()
+
+
+def test_pages_below_the_site_root_reach_the_logo():
+    assert 'src="ismf-logo.png"' in render_web("Brief", _articles(1))
+    assert 'src="../ismf-logo.png"' in render_web("Brief", _articles(1), asset_base="../")
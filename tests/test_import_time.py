@@ -0,0 +1,16 @@
+# tests/test_import_time.py
+from __future__ import annotations
+
+from benchmarks.import_time import LAZY_MODULES, _eager_imports, _import_time_us
+
+# Same budget as `python -m benchmarks.import_time`; measured ~30 ms locally
+BUDGET_MS = 150.0
+
+
+def test_cli_import_stays_within_budget():
+    best_ms = min(_import_time_us("src.cli") for _ in range(3)) / 1000
+    assert best_ms <= BUDGET_MS, f"import src.cli took {best_ms:.1f} ms"
+
+
+def test_cli_import_leaves_heavy_dependencies_lazy():
+    assert _eager_imports("src.cli") == [], f"expected none of {LAZY_MODULES} at startup"
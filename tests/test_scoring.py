@@ -0,0 +1,52 @@
+# tests/test_scoring.py
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.filter import iter_relevant
+from src.scoring import score_articles
+from src.scraper import Article
+
+KEYWORDS = ["fed", "inflation", "rate cut", "cpi"]
+
+
+def _articles():
+    now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    return [
+        Article(
+            title="Fed weighs a rate cut as inflation cools",
+            link="https://news.example/1",
+            source="a",
+            published=now - timedelta(hours=3),
+            summary="Inflation slowed again; the Fed could cut. CPI due Tuesday.",
+        ),
+        Article(
+            title="CPI beats estimates",
+            link="https://news.example/2",
+            source="b",
+            published=None,
+            summary="Core inflation rose, and inflation expectations with it.",
+        ),
+        Article(
+            title="Markets wrap",
+            link="https://news.example/3",
+            source="c",
+            published=now - timedelta(hours=30),
+            summary="Stocks drifted ahead of the Fed decision.",
+        ),
+    ]
+
+
+def test_scores_reuse_the_filters_keyword_counts():
+    now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    matched = list(iter_relevant(_articles(), KEYWORDS))
+    assert [a.keyword_counts for a in matched][1] == {"cpi": 1, "inflation": 2}
+
+    from_filter = score_articles(matched, KEYWORDS, half_life_hours=24, now=now)
+    rescanned = score_articles(
+        [replace(a, keyword_counts={}) for a in matched], KEYWORDS, half_life_hours=24, now=now
+    )
+    np.testing.assert_allclose(from_filter, rescanned)
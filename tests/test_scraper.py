@@ -0,0 +1,31 @@
+# tests/test_scraper.py
+from __future__ import annotations
+
+import threading
+
+from src import scraper
+from src.health import HealthRegistry
+
+
+def test_overall_timeout_only_blames_feeds_that_were_running(tmp_path, monkeypatch):
+    registry = HealthRegistry(tmp_path / "health.json", failure_threshold=1)
+    monkeypatch.setattr(scraper, "registry_from_config", lambda: registry)
+    release = threading.Event()
+
+    def slow_fetch(url, timeout, parse_pool, registry):
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(scraper, "_fetch_tracked", slow_fetch)
+    urls = [f"http://feed.example/{i}" for i in range(4)]
+    try:
+        results = list(
+            scraper._iter_feed_results(urls, max_workers=2, total_timeout=0.2, parse_processes=0)
+        )
+    finally:
+        release.set()
+
+    assert results == []
+    # Two feeds were running when time ran out; the two queued ones never started
+    assert sorted(registry.feeds) == urls[:2]
+    assert all(h.last_error == "overall fetch timeout" for h in registry.feeds.values())
@@ -0,0 +1,103 @@
+# tests/test_send_email.py
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import pytest
+
+from src import config
+from src.send_email import send_newsletter
+
+
+class FakeSendGrid:
+    """
+    Local stand-in for /v3/mail/send that answers with a scripted sequence of
+    statuses; "sleep" stalls past the client's read timeout.
+    """
+
+    def __init__(self, script: List[object]):
+        self.script = list(script)
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fake.requests += 1
+                step = fake.script.pop(0) if fake.script else 202
+                if step == "sleep":
+                    time.sleep(1.0)
+                    step = 202
+                self.send_response(step)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def sendgrid_config(monkeypatch):
+    def configure(host: str) -> None:
+        for name, value in {
+            "SENDGRID_API_KEY": "test-key",
+            "SENDGRID_HOST": host,
+            "FROM_EMAIL": "brief@example.com",
+            "SENDGRID_BATCH_SIZE": 1000,
+            "SENDGRID_WORKERS": 1,
+            "SENDGRID_BACKOFF": 0.0,
+            "SENDGRID_TIMEOUT": 0.3,
+        }.items():
+            monkeypatch.setattr(config, name, value, raising=False)
+
+    return configure
+
+
+def _send(max_retries: int = 3):
+    return send_newsletter(["a@example.com"], "Subject", "<p>hi</p>", "hi", max_retries=max_retries)
+
+
+def test_retries_429_and_5xx_until_accepted(sendgrid_config):
+    fake = FakeSendGrid([429, 503])
+    sendgrid_config(fake.url)
+    try:
+        (result,) = _send()
+    finally:
+        fake.close()
+    assert result.ok and result.attempts == 3
+    assert fake.requests == 3
+
+
+def test_does_not_retry_a_read_timeout(sendgrid_config):
+    # The batch may already have been accepted; a retry could send it twice
+    fake = FakeSendGrid(["sleep"])
+    sendgrid_config(fake.url)
+    try:
+        with pytest.raises(RuntimeError):
+            _send()
+    finally:
+        fake.close()
+    assert fake.requests == 1
+
+
+def test_retries_when_the_connection_is_refused(sendgrid_config, caplog):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    sendgrid_config(f"http://127.0.0.1:{port}")
+    with pytest.raises(RuntimeError, match="URLError"):
+        _send(max_retries=2)
+    assert "failed after 3 attempt(s)" in caplog.text
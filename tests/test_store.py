@@ -0,0 +1,58 @@
+# tests/test_store.py
+from __future__ import annotations
+
+import sqlite3
+
+from src.filter import iter_relevant
+from src.scraper import Article
+from src.store import ArticleStore
+
+
+def _article(n: int) -> Article:
+    return Article(
+        title=f"Fed signals rate path {n}",
+        link=f"https://news.example/{n}",
+        source="https://news.example/rss",
+        published=None,
+        summary="Inflation and the Fed.",
+    )
+
+
+def _relevant(store: ArticleStore, articles):
+    return [a.link for a in iter_relevant(articles, ["fed"], store=store)]
+
+
+def test_articles_stay_unseen_until_marked_sent(tmp_path):
+    path = tmp_path / "articles.sqlite3"
+    batch = [_article(1), _article(2), _article(1)]
+
+    # A run whose send failed: nothing is marked sent
+    with ArticleStore(path) as store:
+        assert _relevant(store, batch) == [batch[0].link, batch[1].link]
+
+    # The re-run gets the same articles, and marks one of them sent
+    with ArticleStore(path) as store:
+        assert _relevant(store, batch) == [batch[0].link, batch[1].link]
+        assert store.mark_sent([batch[0]]) == 1
+
+    with ArticleStore(path) as store:
+        assert _relevant(store, batch) == [batch[1].link]
+        assert store.count() == 2
+
+
+def test_existing_store_keeps_its_articles_seen(tmp_path):
+    path = tmp_path / "articles.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        "CREATE TABLE articles (id INTEGER PRIMARY KEY, link TEXT NOT NULL, title_key TEXT,"
+        " source TEXT NOT NULL, published TEXT, first_seen TEXT NOT NULL,"
+        " last_seen TEXT NOT NULL, data TEXT NOT NULL);"
+        "INSERT INTO articles (link, title_key, source, first_seen, last_seen, data)"
+        " VALUES ('https://news.example/1', 'fed signals rate path 1', 'x',"
+        " '2026-01-01T00:00:00+00:00', '2026-01-01T00:00:00+00:00', '{}');"
+    )
+    conn.commit()
+    conn.close()
+
+    with ArticleStore(path) as store:
+        assert _relevant(store, [_article(1), _article(2)]) == ["https://news.example/2"]